@@ -17,8 +17,16 @@ import re
 
 
 def puts(text: str) -> None:
-    """Emulate Tcl puts command"""
-    print(text, flush=True)
+    """Emulate Tcl puts command (supports -nonewline)"""
+    end = "\n"
+    if text.startswith("-nonewline"):
+        end = ""
+        text = text[len("-nonewline"):].lstrip()
+    # Like Tcl, a double-quoted word is printed without its quotes and
+    # with \n substituted
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        text = text[1:-1].replace("\\n", "\n")
+    print(text, end=end, flush=True)
 
 
 def echo(text: str) -> None:
@@ -58,7 +66,7 @@ def help_cmd() -> None:
     help_text = """
 Demo Tool v1.0 - Mock EDA Tool
 Available commands:
-  puts <text>              - Print text to stdout
+  puts [-nonewline] <text> - Print text to stdout
   echo <text>              - Echo text back
   sleep <seconds>          - Sleep for specified seconds
   slow_puts <text>        - Print text slowly in chunks (tests marker detection)
@@ -21,6 +21,10 @@ setup(
     install_requires=[
         "pyyaml>=5.4",
     ],
+    extras_require={
+        # Faster JSON for queue/result/state files
+        "fast": ["orjson>=3.0"],
+    },
     entry_points={
         "console_scripts": [
             "skillpilot=skillpilot.cli.main:main",
@@ -24,7 +24,7 @@ from pathlib import Path
 from skillpilot.runner.core import Runner
 from skillpilot.runner.adapters import DemoToolAdapter
 from skillpilot.psp.md_loader import PlaybookLoader, SkillLoader
-from skillpilot.protocol import CancelRequest, StopRequest, write_atomic_json, get_current_timestamp_ms
+from skillpilot.protocol import CancelRequest, StopRequest, write_atomic_json, read_json, get_current_timestamp_ms
 from skillpilot.config import (
     load_config,
     get_command,
@@ -35,37 +35,47 @@ from skillpilot.config import (
 
 # Discovery and validation commands
 
+def _iter_md_files(root):
+    """Yield paths of *.md files under root (scandir walk, no per-entry stat)"""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".md"):
+                    yield entry.path
+
+
 def cmd_search(args):
     """Search for skills or playbooks matching a pattern"""
     pattern = args.pattern
     print(f"🔍 Searching for: {pattern}", file=sys.stderr)
     
-    # Use glob to find files
-    from pathlib import Path
-    search_paths = [
+    search_paths = [os.path.normpath(p) for p in [
         "examples/skills",
         "examples/playbooks",
         args.skills_dir if hasattr(args, 'skills_dir') else "examples/skills"
-    ]
-    
+    ]]
+
+    pattern_lower = pattern.lower()
     results = []
     for search_path in search_paths:
-        search_dir = Path(search_path)
-        if not search_dir.exists():
+        if not os.path.isdir(search_path):
             continue
+        kind = 'skill' if 'skill' in search_path.lower() else 'playbook'
 
-        for file_path in search_dir.rglob("*.md"):
+        for file_path in _iter_md_files(search_path):
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-                if pattern.lower() in content.lower():
+                if pattern_lower in content.lower():
                     results.append({
-                        'type': 'skill' if 'skill' in str(search_dir).lower() else 'playbook',
-                        'name': file_path.stem,
-                        'path': str(file_path),
-                        'matches': content.count(pattern.lower()),
+                        'type': kind,
+                        'name': os.path.splitext(os.path.basename(file_path))[0],
+                        'path': file_path,
+                        'matches': content.count(pattern_lower),
                     })
-    
-    
+
     if results:
         print(f"\n📊 Found {len(results)} match(es):", file=sys.stderr)
         for i, result in enumerate(results, 1):
@@ -315,10 +325,8 @@ def cmd_runner_cancel(args):
     Args:
         args: Parsed command line arguments
     """
-    ctl_dir = os.path.join(args.session_dir, "ctl")
-    os.makedirs(ctl_dir, exist_ok=True)
-
-    cancel_path = os.path.join(ctl_dir, "cancel.json")
+    # write_atomic_json creates ctl/ if needed
+    cancel_path = os.path.join(args.session_dir, "ctl", "cancel.json")
 
     from skillpilot.protocol import CancelScope
     cancel = CancelRequest(
@@ -344,10 +352,8 @@ def cmd_runner_stop(args):
     Args:
         args: Parsed command line arguments
     """
-    ctl_dir = os.path.join(args.session_dir, "ctl")
-    os.makedirs(ctl_dir, exist_ok=True)
-
-    stop_path = os.path.join(ctl_dir, "stop.json")
+    # write_atomic_json creates ctl/ if needed
+    stop_path = os.path.join(args.session_dir, "ctl", "stop.json")
 
     from skillpilot.protocol import StopMode
     stop = StopRequest(
@@ -383,12 +389,17 @@ def cmd_session_list(args):
             session_path = os.path.join(session_dir, session_id)
             state_file = os.path.join(session_path, "state", "state.json")
             
-            if os.path.exists(state_file):
-                import json
-                with open(state_file, 'r') as f:
-                    state = json.load(f)
-                    status = state.get('status', 'unknown')
-                    print(f"  • {session_id} - Status: {status}", file=sys.stderr)
+            # One binary read per session; None when the file is missing
+            try:
+                state = read_json(state_file)
+            except ValueError:
+                # Rewritten in place on BUSY/IDLE flips (see PROTOCOL.md);
+                # caught mid-write, not broken
+                print(f"  • {session_id} - Status: updating", file=sys.stderr)
+                continue
+            if state is not None:
+                status = state.get('status', 'unknown')
+                print(f"  • {session_id} - Status: {status}", file=sys.stderr)
             else:
                 print(f"  • {session_id} - Status: incomplete", file=sys.stderr)
         
@@ -419,15 +430,17 @@ def cmd_session_current(args):
     
     try:
         state_file = os.path.join(session_path, "state", "state.json")
+        try:
+            state = read_json(state_file)
+        except ValueError:
+            # Rewritten in place on BUSY/IDLE flips (see PROTOCOL.md);
+            # caught mid-write, not broken
+            state = {"status": "updating"}
         
-        if not os.path.exists(state_file):
+        if state is None:
             print(f"⚠️  Session state file not found: {state_file}", file=sys.stderr)
             return 1
         
-        import json
-        with open(state_file, 'r') as f:
-            state = json.load(f)
-        
         print(f"\n📊 Session: {session_id}", file=sys.stderr)
         print(f"   Status: {state.get('status', 'unknown')}", file=sys.stderr)
         print(f"   Path: {session_path}", file=sys.stderr)
@@ -9,6 +9,12 @@ import os
 import yaml
 from typing import Dict, Optional
 
+# libyaml's C loader when PyYAML was built with it; same safe semantics
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 
 def load_config(config_path: str) -> Dict:
     """
@@ -39,7 +45,7 @@ def load_config(config_path: str) -> Dict:
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_SafeLoader)
 
 
 def get_command(config: Dict, tool_name: str) -> Optional[str]:
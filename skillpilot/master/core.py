@@ -17,13 +17,17 @@ import uuid
 from typing import Dict, List, Optional
 from datetime import datetime
 
-from skillpilot.psp.schema import Playbook, Skill, PlaybookDefaults
+from skillpilot.psp.schema import Playbook, Skill, SkillStep, PlaybookDefaults
+from skillpilot.watch import DirWatcher, IN_CLOSE_WRITE, IN_MOVED_TO
 from skillpilot.protocol import (
     CommandRequest,
     CommandResult,
     PlaybookResult,
     CancelPolicy,
+    Marker,
+    MarkerMode,
     write_atomic_json,
+    write_atomic_json_many,
     read_json,
     get_current_timestamp_ms,
     DEFAULT_MARKER_PREFIX,
@@ -42,6 +46,9 @@ class Master:
     - Aggregates results
     """
 
+    # Upper bound on a single result wait; also the poll interval without inotify
+    RESULT_POLL_S = 0.5
+
     def __init__(
         self,
         playbook: Playbook,
@@ -61,11 +68,22 @@ class Master:
         self.session_dir = session_dir or self._create_session_dir()
         self.session_id: str = os.path.basename(self.session_dir)
 
+        # Session paths, resolved once
+        self.path_queue = os.path.join(self.session_dir, "queue")
+        self.path_result = os.path.join(self.session_dir, "result")
+        self.path_output = os.path.join(self.session_dir, "output")
+        self.path_playbook_result = os.path.join(self.session_dir, "playbook_result.json")
+        os.makedirs(self.path_queue, exist_ok=True)
+        os.makedirs(self.path_result, exist_ok=True)
+
         # Track execution state
         self.cmd_seq: int = 0
         self.results: Dict[str, CommandResult] = {}
         self.skill_results: Dict[str, Dict] = {}
         self.stopping: bool = False
+        self._result_watcher: Optional[DirWatcher] = None
+        # cmd_id -> result file the Runner will write, recorded at queue time
+        self._result_paths: Dict[str, str] = {}
 
     def _create_session_dir(self) -> str:
         """Create a new session directory"""
@@ -78,6 +96,22 @@ class Master:
 
         return session_dir
 
+    @staticmethod
+    def _format_arg(key: str, value) -> str:
+        """Format one step argument as a Tcl option"""
+        if isinstance(value, str):
+            return f' -{key} "{value}"'
+        if isinstance(value, bool):
+            return f" -{key}" if value else ""
+        return f" -{key} {value}"
+
+    @classmethod
+    def _build_payload(cls, step: SkillStep) -> str:
+        """Build the Tcl payload for a step: poke::<action> <args...>"""
+        format_arg = cls._format_arg
+        args_str = "".join([format_arg(key, value) for key, value in step.args.items()])
+        return f"poke::{step.action}{args_str}\n"
+
     def _compile_skill(self, skill: Skill) -> List[CommandRequest]:
         """
         Compile a skill into Runner commands.
@@ -88,61 +122,52 @@ class Master:
         Returns:
             List of CommandRequest objects
         """
-        commands = []
-
-        for step in skill.steps:
-            self.cmd_seq += 1
-            cmd_id = str(uuid.uuid4())
-
-            # Build Tcl payload
-            # Format: poke::<action> <args...>
-            args_str = ""
-            for key, value in step.args.items():
-                if isinstance(value, str):
-                    args_str += f' -{key} "{value}"'
-                elif isinstance(value, bool):
-                    if value:
-                        args_str += f' -{key}'
-                else:
-                    args_str += f' -{key} {value}'
-
-            payload = f'poke::{step.action}{args_str}\n'
+        defaults = self.playbook.defaults
+        cancel_policy = CancelPolicy(defaults.cancel_policy)
+        build_payload = self._build_payload
+        uuid4 = uuid.uuid4
 
-            # Create command request
-            from skillpilot.protocol import Marker, MarkerMode
-
-            cmd = CommandRequest(
+        commands = []
+        for seq, step in enumerate(skill.steps, start=self.cmd_seq + 1):
+            cmd_id = str(uuid4())
+            commands.append(CommandRequest(
                 cmd_id=cmd_id,
-                seq=self.cmd_seq,
+                seq=seq,
                 kind="tcl",
-                payload=payload,
-                timeout_s=step.timeout_s or self.playbook.defaults.timeout_s,
-                cancel_policy=CancelPolicy(self.playbook.defaults.cancel_policy),
+                payload=build_payload(step),
+                timeout_s=step.timeout_s or defaults.timeout_s,
+                cancel_policy=cancel_policy,
                 marker=Marker(prefix=DEFAULT_MARKER_PREFIX, token=cmd_id, mode=MarkerMode.RUNNER_INJECT),
-            )
-
-            commands.append(cmd)
+            ))
+        self.cmd_seq += len(commands)
 
         return commands
 
-    def _write_command(self, cmd: CommandRequest) -> str:
+    def _write_commands(self, commands: List[CommandRequest]) -> List[str]:
         """
-        Write command file to queue.
+        Write a batch of command files to the queue.
 
         Args:
-            cmd: Command to write
+            commands: Commands to write, in queue order
 
         Returns:
-            Path to written file
-        """
-        queue_dir = os.path.join(self.session_dir, "queue")
-        os.makedirs(queue_dir, exist_ok=True)
+            Paths to written files
 
-        filename = f"cmd_{cmd.seq}_{cmd.cmd_id}.json"
-        filepath = os.path.join(queue_dir, filename)
-        write_atomic_json(filepath, cmd.to_dict())
+        Raises:
+            FileExistsError: If a command file is already queued
+        """
+        queue_dir = self.path_queue
+        result_dir = self.path_result
+        items = []
+        for cmd in commands:
+            filename = f"cmd_{cmd.seq}_{cmd.cmd_id}.json"
+            items.append((f"{queue_dir}/{filename}", cmd.to_dict()))
+            self._result_paths[cmd.cmd_id] = f"{result_dir}/{filename}"
+        # Queue files are never overwritten; only the Runner reads them,
+        # so skip the indentation
+        write_atomic_json_many(items, exclusive=True, pretty=False)
 
-        return filepath
+        return [filepath for filepath, _ in items]
 
     def _read_result(self, cmd: CommandRequest) -> Optional[CommandResult]:
         """
@@ -154,22 +179,31 @@ class Master:
         Returns:
             CommandResult if found, None otherwise
         """
-        result_dir = os.path.join(self.session_dir, "result")
-        filename = f"cmd_{cmd.seq}_{cmd.cmd_id}.json"
-        filepath = os.path.join(result_dir, filename)
-
-        if not os.path.exists(filepath):
-            return None
-
+        # read_json() already maps a missing file to None; no exists() probe
+        filepath = self._result_paths.get(cmd.cmd_id)
+        if filepath is None:
+            filepath = f"{self.path_result}/cmd_{cmd.seq}_{cmd.cmd_id}.json"
         data = read_json(filepath)
         if data:
             return CommandResult.from_dict(data)
         return None
 
+    def _get_result_watcher(self) -> DirWatcher:
+        """Return the result/ watcher, creating it on first use"""
+        if self._result_watcher is None:
+            watcher = DirWatcher(poll_interval_s=self.RESULT_POLL_S)
+            # Runner publishes results via tmp + rename
+            watcher.add_watch(self.path_result, IN_CLOSE_WRITE | IN_MOVED_TO)
+            self._result_watcher = watcher
+        return self._result_watcher
+
     def _wait_for_result(self, cmd: CommandRequest, timeout_s: int = 3600) -> Optional[CommandResult]:
         """
         Wait for result file to appear.
 
+        Blocks on result/ change notifications rather than sleeping a fixed
+        interval (falls back to polling where inotify is unavailable).
+
         Args:
             cmd: Command to wait for
             timeout_s: Maximum time to wait (default 1 hour)
@@ -177,16 +211,23 @@ class Master:
         Returns:
             CommandResult if completed, None if timeout
         """
-        start_time = time.time()
-
-        while time.time() - start_time < timeout_s:
+        # Watch before the first read so a result landing in between still
+        # wakes the wait below
+        watcher = self._get_result_watcher()
+        # Monotonic: a wall-clock step must not stretch or cut the timeout
+        monotonic = time.monotonic
+        deadline = monotonic() + timeout_s
+        poll_s = self.RESULT_POLL_S
+
+        while True:
             result = self._read_result(cmd)
             if result:
                 return result
 
-            time.sleep(0.5)
-
-        return None
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return None
+            watcher.wait(min(remaining, poll_s))
 
     def _run_skill(self, skill_name: str) -> Dict:
         """
@@ -214,9 +255,12 @@ class Master:
 
         print(f"  -> Generated {len(commands)} commands", file=sys.stderr)
 
+        # Nothing to queue or wait for
+        if not commands:
+            return {"name": skill_name, "status": "ok", "commands": []}
+
         # Write commands to queue
-        for cmd in commands:
-            self._write_command(cmd)
+        self._write_commands(commands)
 
         # Wait for all commands to complete
         skill_results = []
@@ -267,6 +311,10 @@ class Master:
         print(f"Starting playbook execution: {self.playbook.name}", file=sys.stderr)
         print(f"Session directory: {self.session_dir}", file=sys.stderr)
 
+        missing = [name for name in self.playbook.skills if name not in self.skills]
+        if missing:
+            print(f"Warning: skills not found: {', '.join(missing)}", file=sys.stderr)
+
         try:
             # Execute each skill
             for skill_name in self.playbook.skills:
@@ -300,8 +348,9 @@ class Master:
             )
 
             # Write playbook result
-            result_path = os.path.join(self.session_dir, "playbook_result.json")
-            write_atomic_json(result_path, playbook_result.to_dict())
+            result_path = self.path_playbook_result
+            # The one file that outlives the session: make it crash-safe
+            write_atomic_json(result_path, playbook_result.to_dict(), durable=True)
 
             print(f"\nPlaybook execution completed: {status}", file=sys.stderr)
             print(f"Result file: {result_path}", file=sys.stderr)
@@ -323,6 +372,11 @@ class Master:
                 end_ts=get_current_timestamp_ms(),
             )
 
+        finally:
+            if self._result_watcher is not None:
+                self._result_watcher.close()
+                self._result_watcher = None
+
     def _determine_playbook_status(self) -> str:
         """Determine overall playbook status"""
         if self.stopping:
@@ -345,7 +399,7 @@ class Master:
     def _collect_evidence(self) -> List[str]:
         """Collect evidence files from outputs"""
         evidence = []
-        output_dir = os.path.join(self.session_dir, "output")
+        output_dir = self.path_output
 
         if os.path.exists(output_dir):
             for filename in os.listdir(output_dir):
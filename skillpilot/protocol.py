@@ -6,16 +6,70 @@ All file writes must be atomic using tmp + rename pattern.
 
 import json
 import os
+import sys
+import time
 import uuid
-from dataclasses import dataclass, field, asdict
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timezone
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; stdlib json otherwise
+    orjson = None
+
 
 # Default marker prefix for completion detection
 DEFAULT_MARKER_PREFIX = "__SP_DONE__"
 
+# @dataclass(**DATACLASS_SLOTS): slotted dataclasses (no per-instance
+# __dict__) need Python 3.10+
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+_UTC = timezone.utc
+
+# JSON codec for control-plane files: same indent=2 (or compact) layout
+# either way
+if orjson is not None:
+    _ORJSON_PRETTY = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+    def _json_dumps(data: Any, pretty: bool = True) -> bytes:
+        return orjson.dumps(data, option=_ORJSON_PRETTY if pretty else orjson.OPT_NON_STR_KEYS)
+
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(data: Any, pretty: bool = True) -> bytes:
+        if pretty:
+            return json.dumps(data, indent=2).encode("utf-8")
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    _json_loads = json.loads
+
+# Temp-file suffix for atomic writes; refreshed in forked children
+_PID = os.getpid()
+
+
+def _refresh_pid() -> None:
+    global _PID
+    _PID = os.getpid()
+
+
+# POSIX only; there is no fork() to follow on Windows
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_refresh_pid)
+
+
+def get_current_timestamp_ms() -> str:
+    """Get current timestamp as milliseconds since epoch"""
+    return str(time.time_ns() // 1_000_000)
+
+
+def get_current_timestamp_iso() -> str:
+    """Get current timestamp in ISO8601 format"""
+    # Fixed microsecond precision; swap the "+00:00" offset for "Z"
+    return datetime.now(_UTC).isoformat(timespec="microseconds")[:-6] + "Z"
+
 
 class CommandStatus(str, Enum):
     """Status of a command execution"""
@@ -59,6 +113,31 @@ class MarkerMode(str, Enum):
     PAYLOAD_CONTAINS = "payload_contains"
 
 
+# Value -> member lookup tables for decoding enums in from_dict
+_COMMAND_STATUS_BY_VALUE = {m.value: m for m in CommandStatus}
+_RUNNER_PHASE_BY_VALUE = {m.value: m for m in RunnerPhase}
+_CANCEL_SCOPE_BY_VALUE = {m.value: m for m in CancelScope}
+_CANCEL_POLICY_BY_VALUE = {m.value: m for m in CancelPolicy}
+_STOP_MODE_BY_VALUE = {m.value: m for m in StopMode}
+_MARKER_MODE_BY_VALUE = {m.value: m for m in MarkerMode}
+
+
+def _enum_from_value(by_value: Dict[str, Enum], enum_cls: type, value: Any) -> Any:
+    """
+    Look up an enum member by value in a precomputed table.
+
+    Raises:
+        ValueError: If value is not a member value (same as enum_cls(value))
+    """
+    try:
+        member = by_value.get(value)
+    except TypeError:  # Unhashable, e.g. a list from a malformed file
+        member = None
+    if member is None:
+        raise ValueError(f"invalid {enum_cls.__name__}: {value!r}")
+    return member
+
+
 @dataclass
 class Marker:
     """Marker configuration for command completion detection"""
@@ -83,20 +162,37 @@ class CommandRequest:
     marker: Marker = field(default_factory=Marker)
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        marker = self.marker
+        return {
+            "cmd_id": self.cmd_id,
+            "seq": self.seq,
+            "kind": self.kind,
+            "payload": self.payload,
+            "timeout_s": self.timeout_s,
+            "cancel_policy": self.cancel_policy,
+            "marker": {
+                "prefix": marker.prefix,
+                "token": marker.token,
+                "mode": marker.mode,
+            },
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "CommandRequest":
-        marker_data = data.get("marker", {})
-        marker = Marker(**marker_data)
+        marker_data = data.get("marker") or {}
+        marker = Marker(
+            prefix=marker_data.get("prefix", DEFAULT_MARKER_PREFIX),
+            token=marker_data.get("token", ""),
+            mode=_enum_from_value(_MARKER_MODE_BY_VALUE, MarkerMode, marker_data.get("mode", "runner_inject")),
+        )
 
         return cls(
-            cmd_id=data.get("cmd_id", str(uuid.uuid4())),
+            cmd_id=data["cmd_id"] if "cmd_id" in data else str(uuid.uuid4()),
             seq=data.get("seq", 0),
             kind=data.get("kind", "tcl"),
             payload=data.get("payload", ""),
             timeout_s=data.get("timeout_s"),
-            cancel_policy=CancelPolicy(data.get("cancel_policy", "ctrl_c")),
+            cancel_policy=_enum_from_value(_CANCEL_POLICY_BY_VALUE, CancelPolicy, data.get("cancel_policy", "ctrl_c")),
             marker=marker,
         )
 
@@ -118,13 +214,22 @@ class CommandResult:
     stats: Optional[Dict[str, Any]] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "cmd_id": self.cmd_id,
+            "status": self.status,
+            "start_ts": self.start_ts,
+            "end_ts": self.end_ts,
+            "exit_reason": self.exit_reason,
+            "output_path": self.output_path,
+            "tail_path": self.tail_path,
+            "stats": self.stats,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "CommandResult":
         return cls(
             cmd_id=data["cmd_id"],
-            status=CommandStatus(data["status"]),
+            status=_enum_from_value(_COMMAND_STATUS_BY_VALUE, CommandStatus, data["status"]),
             start_ts=data["start_ts"],
             end_ts=data["end_ts"],
             exit_reason=data["exit_reason"],
@@ -146,20 +251,27 @@ class SessionState:
     runner_pid: int
     tool_pid: Optional[int] = None
     current_cmd_id: Optional[str] = None
-    updated_at: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    updated_at: str = field(default_factory=get_current_timestamp_iso)
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "phase": self.phase,
+            "session_id": self.session_id,
+            "runner_pid": self.runner_pid,
+            "tool_pid": self.tool_pid,
+            "current_cmd_id": self.current_cmd_id,
+            "updated_at": self.updated_at,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "SessionState":
         return cls(
-            phase=RunnerPhase(data["phase"]),
+            phase=_enum_from_value(_RUNNER_PHASE_BY_VALUE, RunnerPhase, data["phase"]),
             session_id=data["session_id"],
             runner_pid=data["runner_pid"],
             tool_pid=data.get("tool_pid"),
             current_cmd_id=data.get("current_cmd_id"),
-            updated_at=data.get("updated_at", datetime.utcnow().isoformat() + "Z"),
+            updated_at=data.get("updated_at", get_current_timestamp_iso()),
         )
 
 
@@ -170,14 +282,14 @@ class Heartbeat:
 
     Runner writes this periodically to show liveness.
     """
-    timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    timestamp: str = field(default_factory=get_current_timestamp_iso)
 
     def to_dict(self) -> Dict[str, str]:
-        return asdict(self)
+        return {"timestamp": self.timestamp}
 
     @classmethod
     def from_dict(cls, data: Dict[str, str]) -> "Heartbeat":
-        return cls(timestamp=data.get("timestamp", datetime.utcnow().isoformat() + "Z"))
+        return cls(timestamp=data.get("timestamp", get_current_timestamp_iso()))
 
 
 @dataclass
@@ -192,7 +304,11 @@ class LeaseInfo:
     owner: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "lease_id": self.lease_id,
+            "expires_at": self.expires_at,
+            "owner": self.owner,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "LeaseInfo":
@@ -206,13 +322,15 @@ class LeaseInfo:
         """Check if lease has expired (assuming epoch_ms format)"""
         try:
             expires_ms = float(self.expires_at)
-            current_ms = datetime.utcnow().timestamp() * 1000
+            current_ms = time.time_ns() // 1_000_000
             return current_ms >= expires_ms
         except (ValueError, TypeError):
             # If not epoch_ms, try ISO8601
             try:
                 expires = datetime.fromisoformat(self.expires_at.replace("Z", "+00:00"))
-                return datetime.utcnow() >= expires
+                if expires.tzinfo is None:
+                    expires = expires.replace(tzinfo=_UTC)
+                return datetime.now(_UTC) >= expires
             except ValueError:
                 return True  # Treat as expired if parsing fails
 
@@ -226,17 +344,17 @@ class CancelRequest:
     """
     scope: CancelScope
     cmd_id: Optional[str] = None
-    ts: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    ts: str = field(default_factory=get_current_timestamp_iso)
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {"scope": self.scope, "cmd_id": self.cmd_id, "ts": self.ts}
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "CancelRequest":
         return cls(
-            scope=CancelScope(data["scope"]),
+            scope=_enum_from_value(_CANCEL_SCOPE_BY_VALUE, CancelScope, data["scope"]),
             cmd_id=data.get("cmd_id"),
-            ts=data.get("ts", datetime.utcnow().isoformat() + "Z"),
+            ts=data.get("ts", get_current_timestamp_iso()),
         )
 
 
@@ -248,16 +366,16 @@ class StopRequest:
     Master writes this to stop the session.
     """
     mode: StopMode
-    ts: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    ts: str = field(default_factory=get_current_timestamp_iso)
 
     def to_dict(self) -> Dict[str, str]:
-        return asdict(self)
+        return {"mode": self.mode, "ts": self.ts}
 
     @classmethod
     def from_dict(cls, data: Dict[str, str]) -> "StopRequest":
         return cls(
-            mode=StopMode(data["mode"]),
-            ts=data.get("ts", datetime.utcnow().isoformat() + "Z"),
+            mode=_enum_from_value(_STOP_MODE_BY_VALUE, StopMode, data["mode"]),
+            ts=data.get("ts", get_current_timestamp_iso()),
         )
 
 
@@ -271,32 +389,171 @@ class PlaybookResult:
     skills: List[Dict[str, Any]]
     failure_reason: Optional[str] = None
     evidence_files: List[str] = field(default_factory=list)
-    start_ts: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
-    end_ts: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    start_ts: str = field(default_factory=get_current_timestamp_iso)
+    end_ts: str = field(default_factory=get_current_timestamp_iso)
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "playbook_name": self.playbook_name,
+            "status": self.status,
+            "skills": self.skills,
+            "failure_reason": self.failure_reason,
+            "evidence_files": self.evidence_files,
+            "start_ts": self.start_ts,
+            "end_ts": self.end_ts,
+        }
 
 
 # Atomic file write utilities
-def write_atomic_json(filepath: str, data: Dict[str, Any]) -> None:
+def write_atomic_json(
+    filepath: str,
+    data: Dict[str, Any],
+    exclusive: bool = False,
+    pretty: bool = True,
+    durable: bool = False,
+) -> None:
     """
     Write JSON file atomically using tmp + rename pattern.
 
     Args:
         filepath: Target file path
         data: Data to write (must be JSON-serializable)
+        exclusive: Publish with link() instead of replace() so an existing
+            target is never replaced
+        pretty: Indent for humans; pass False for compact machine-read files
+        durable: fsync the file and its directory so the write survives a
+            crash; transient control-plane files don't need this
+
+    Raises:
+        FileExistsError: If exclusive is set and filepath already exists
     """
     # Create parent directories if needed
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    parent = os.path.dirname(filepath)
+    os.makedirs(parent, exist_ok=True)
 
     # Write to temp file
-    tmp_path = f"{filepath}.tmp.{os.getpid()}"
-    with open(tmp_path, "w") as f:
-        json.dump(data, f, indent=2)
+    # Serialize up front: json.dump() issues one write() per token
+    payload = _json_dumps(data, pretty)
+    tmp_path = f"{filepath}.tmp.{_PID}"
+    # Raw fd: open/write/close only, without the fstat/isatty/lseek that a
+    # buffered file object adds
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        os.write(fd, payload)
+        if durable:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    if exclusive:
+        # link() fails with EEXIST atomically, no separate existence check
+        try:
+            os.link(tmp_path, filepath)
+        finally:
+            os.unlink(tmp_path)
+    else:
+        # Atomic rename; replace() also overwrites an existing target on
+        # Windows, where rename() would fail
+        os.replace(tmp_path, filepath)
+
+    if durable:
+        _fsync_dir(parent)
+
+
+def _fsync_dir(path: str) -> None:
+    """fsync a directory so entries created or renamed in it are durable"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic_json_many(
+    items: List[Tuple[str, Dict[str, Any]]],
+    exclusive: bool = False,
+    pretty: bool = True,
+    durable: bool = False,
+) -> None:
+    """
+    Write several JSON files atomically, sharing the per-call overhead.
+
+    All temp files are written first, then published in order with the
+    same replace()/link() as write_atomic_json. Parent directories are
+    created (and, when durable, fsynced) once each rather than per file.
+
+    Args:
+        items: (filepath, data) pairs in publish order
+        exclusive: Publish with link() so existing targets are never replaced
+        pretty: Indent for humans; pass False for compact machine-read files
+        durable: fsync every file before publishing and each parent
+            directory once after
+
+    Raises:
+        FileExistsError: If exclusive is set and a target already exists;
+            files before it in items remain published
+    """
+    dirs: Dict[str, None] = {}
+    pending: List[Tuple[str, str]] = []
+    published = 0
+    try:
+        for filepath, data in items:
+            parent = os.path.dirname(filepath)
+            if parent not in dirs:
+                os.makedirs(parent, exist_ok=True)
+                dirs[parent] = None
+
+            tmp_path = f"{filepath}.tmp.{_PID}"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            pending.append((tmp_path, filepath))
+            try:
+                os.write(fd, _json_dumps(data, pretty))
+                if durable:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+
+        for tmp_path, filepath in pending:
+            if exclusive:
+                os.link(tmp_path, filepath)
+                os.unlink(tmp_path)
+            else:
+                os.replace(tmp_path, filepath)
+            published += 1
+    finally:
+        # Temp files not published (error part-way through)
+        for tmp_path, _ in pending[published:]:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+
+    if durable:
+        for parent in dirs:
+            _fsync_dir(parent)
+
+
+def write_nonatomic_json(filepath: str, data: Dict[str, Any], fsync: bool = False) -> None:
+    """
+    Overwrite a JSON file in place with a single write().
 
-    # Atomic rename
-    os.rename(tmp_path, filepath)
+    Cheaper than write_atomic_json (no temp file or rename) but a reader can
+    briefly see an empty file. Only for frequently rewritten, best-effort
+    files such as the heartbeat.
+
+    Args:
+        filepath: Target file path (parent directory must exist)
+        data: Data to write (must be JSON-serializable)
+        fsync: Flush to stable storage before returning
+    """
+    payload = _json_dumps(data)
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        os.write(fd, payload)
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
 
 
 def read_json(filepath: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
@@ -310,18 +567,8 @@ def read_json(filepath: str, default: Optional[Dict[str, Any]] = None) -> Option
     Returns:
         Parsed JSON data or default
     """
-    if not os.path.exists(filepath):
+    try:
+        with open(filepath, "rb") as f:
+            return _json_loads(f.read())
+    except FileNotFoundError:
         return default
-
-    with open(filepath, "r") as f:
-        return json.load(f)
-
-
-def get_current_timestamp_ms() -> str:
-    """Get current timestamp as milliseconds since epoch"""
-    return str(int(datetime.utcnow().timestamp() * 1000))
-
-
-def get_current_timestamp_iso() -> str:
-    """Get current timestamp in ISO8601 format"""
-    return datetime.utcnow().isoformat() + "Z"
@@ -7,11 +7,28 @@ Simple format: no complex frontmatter, just clear headings and lists.
 
 import os
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 
 from skillpilot.psp.schema import Playbook, Skill, PlaybookDefaults, SkillStep
 
+# Bold section labels recognised by parse_markdown_file
+_SECTION_KEYS = ("inputs", "steps", "skills", "defaults")
+
+# Compiled once at import; the loaders call these for every line/step
+_STEP_HEADER_RE = re.compile(r"^(\d+)\.\s+(.+)")
+_STEP_NUMBER_RE = re.compile(r"^\d+\.")
+_INLINE_STEP_RE = re.compile(r"(.+?):\s*Action\s+(.+)")
+_ACTION_RE = re.compile(r"Action:\s*([^\n]+?)(?=\s*$|\n|Timeout:|$)", re.IGNORECASE)
+_POKE_ACTION_RE = re.compile(r"Action\s+poke::([^\s\n]+)")
+_ARGS_RE = re.compile(r"Args?:\s*([^\n]+?)(?=\s*$|\n|Timeout:|$)", re.IGNORECASE)
+_STEP_FIELD_RE = re.compile(r"(Action|Args?|Timeout):", re.IGNORECASE)
+_TIMEOUT_RE = re.compile(r"Timeout:\s*(\d+)s?", re.IGNORECASE)
+_ARG_SPLIT_RE = re.compile(r"-([a-zA-Z_][a-zA-Z0-9_]*)")
+
+# Parsed skills: abspath -> (st_mtime_ns, st_size, Skill)
+_SKILL_CACHE: Dict[str, Tuple[int, int, Skill]] = {}
+
 
 def parse_markdown_file(filepath: str) -> Dict[str, Any]:
     """
@@ -33,9 +50,6 @@ def parse_markdown_file(filepath: str) -> Dict[str, Any]:
     Args:
         parse_markdown_file(filepath)
     """
-    with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read()
-
     result = {
         "name": None,
         "inputs_schema": None,
@@ -44,57 +58,45 @@ def parse_markdown_file(filepath: str) -> Dict[str, Any]:
         "defaults": {},
     }
 
-    # Extract name (first heading)
-    name_match = re.search(r"^#\s+(.+?)\s*$", content, re.MULTILINE)
-    if name_match:
-        result["name"] = name_match.group(1).strip()
-
-    # Extract inputs section
-    inputs_section = re.search(
-        r"\*\*Inputs:\*\*\s*(.+?)(?=\*\*[A-Z]|\Z)",
-        content,
-        re.MULTILINE | re.DOTALL | re.IGNORECASE
-    )
-    if inputs_section:
-        inputs_text = inputs_section.group(1).strip()
-        result["inputs_schema"] = parse_inputs_section(inputs_text)
-
-    # Extract steps section
-    steps_section = re.search(
-        r"\*\*Steps:\*\*\s*(.+?)(?=\*\*[A-Z]|\Z)",
-        content,
-        re.MULTILINE | re.DOTALL | re.IGNORECASE
-    )
-    if steps_section:
-        steps_text = steps_section.group(1).strip()
-        result["steps"] = parse_steps_section(steps_text)
-
-    # Extract skills section (for playbooks)
-    skills_section = re.search(
-        r"\*\*Skills:\*\*\s*(.+?)(?=\*\*[A-Z]|\Z)",
-        content,
-        re.MULTILINE | re.DOTALL | re.IGNORECASE
-    )
-    if skills_section:
-        skills_text = skills_section.group(1).strip()
-        result["skills"] = parse_skills_section(skills_text)
-
-    # Extract defaults section (for playbooks)
-    defaults_section = re.search(
-        r"\*\*Defaults:\*\*\s*(.+?)(?=\*\*[A-Z]|\Z)",
-        content,
-        re.MULTILINE | re.DOTALL | re.IGNORECASE
-    )
-    if defaults_section:
-        defaults_text = defaults_section.group(1).strip()
-        result["defaults"] = parse_defaults_section(defaults_text)
+    # Single pass: collect stripped lines per **Section:** until the next
+    # line opening another bold label
+    sections: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+
+            if line.startswith("**") and line[2:3].isalpha():
+                current = None
+                label, sep, rest = line[2:].partition(":**")
+                label = label.lower()
+                if sep and label in _SECTION_KEYS and label not in sections:
+                    current = sections[label] = []
+                    line = rest.strip()
+
+            # Name is the first top-level heading
+            if result["name"] is None and line.startswith("#") and line[1:2].isspace():
+                result["name"] = line[1:].strip()
+
+            if current is not None and line:
+                current.append(line)
+
+    if "inputs" in sections:
+        result["inputs_schema"] = parse_inputs_section(sections["inputs"])
+    if "steps" in sections:
+        result["steps"] = parse_steps_section(sections["steps"])
+    if "skills" in sections:
+        result["skills"] = parse_skills_section(sections["skills"])
+    if "defaults" in sections:
+        result["defaults"] = parse_defaults_section(sections["defaults"])
 
     return result
 
 
-def parse_inputs_section(text: str) -> Dict[str, Any]:
+def parse_inputs_section(lines: List[str]) -> Dict[str, Any]:
     """
-    Parse inputs section text into schema.
+    Parse inputs section lines into schema.
 
     Format:
     - param1: value
@@ -102,12 +104,17 @@ def parse_inputs_section(text: str) -> Dict[str, Any]:
     """
     inputs = {}
 
-    lines = [line.strip() for line in text.strip().split("\n") if line.strip()]
     for line in lines:
         if line.startswith("- "):
             # Format: - param: value or -param value
             line = line[1:].strip()  # Remove leading "- "
-            parts = re.split(r"\s*:\s*|\s+", line, maxsplit=1)
+            # Split at whichever comes first: the colon or whitespace
+            head, sep, tail = line.partition(":")
+            head = head.rstrip()
+            if sep and len(head.split()) <= 1:
+                parts = [head, tail]
+            else:
+                parts = line.split(None, 1)
             if len(parts) == 2:
                 key = parts[0].strip()
                 value = parts[1].strip()
@@ -118,9 +125,9 @@ def parse_inputs_section(text: str) -> Dict[str, Any]:
     return inputs
 
 
-def parse_steps_section(text: str) -> List[SkillStep]:
+def parse_steps_section(lines: List[str]) -> List[SkillStep]:
     """
-    Parse steps section text into SkillStep objects.
+    Parse steps section lines into SkillStep objects.
 
     Format:
     1. Step Name
@@ -136,14 +143,12 @@ def parse_steps_section(text: str) -> List[SkillStep]:
     """
     steps = []
 
-    lines = [line.strip() for line in text.strip().split("\n") if line.strip()]
-
     i = 0
     while i < len(lines):
         line = lines[i]
 
         # Check if line starts with a number + period (1., 2., etc)
-        step_header_match = re.match(r"^(\d+)\.\s+(.+)", line)
+        step_header_match = _STEP_HEADER_RE.match(line)
         if step_header_match:
             step_num = step_header_match.group(1)
             rest_of_header = step_header_match.group(2).strip()
@@ -154,7 +159,7 @@ def parse_steps_section(text: str) -> List[SkillStep]:
             while i < len(lines):
                 next_line = lines[i].strip()
                 # Check if next step starts
-                if re.match(r"^\d+\.", next_line) or next_line.startswith("Steps:") or next_line.startswith("**"):
+                if _STEP_NUMBER_RE.match(next_line) or next_line.startswith("Steps:") or next_line.startswith("**"):
                     break
                 step_content_lines.append(next_line)
                 i += 1
@@ -178,11 +183,11 @@ def parse_steps_section(text: str) -> List[SkillStep]:
 
             for content_line in step_content_lines:
                 # Check for numbered list items
-                num_match = re.match(r"^(\d+)\.\s+(.+)", content_line)
+                num_match = _STEP_HEADER_RE.match(content_line)
                 if num_match:
                     content = num_match.group(1).strip()
                     # Parse inline format: "Step Name: Action..."
-                    inline_match = re.match(r"(.+?):\s*Action\s+(.+)", content)
+                    inline_match = _INLINE_STEP_RE.match(content)
                     if inline_match:
                         step_name = inline_match.group(1).strip()
                         action_args = inline_match.group(2).strip()
@@ -197,44 +202,56 @@ def parse_steps_section(text: str) -> List[SkillStep]:
     return steps
 
 
+def _match_field(pattern, content: str, labels, kind: str, pos: int):
+    """Return the first match of ``pattern`` at a ``kind`` label at or after ``pos``"""
+    for start, label in labels:
+        if label == kind and start >= pos:
+            match = pattern.match(content, start)
+            if match:
+                return match
+    return None
+
+
 def parse_step_content(step_name: str, content: Optional[str]) -> SkillStep:
     step = SkillStep(step_name, "", args={}, timeout_s=None)
 
     if not content:
         return step
 
-    # Extract Action
-    action_match = re.search(r"Action:\s*([^\n]+?)(?=\s*$|\n|Timeout:|$)", content, re.IGNORECASE)
+    # Locate every field label in one scan, then resolve fields in order:
+    # Action first, Args after it, Timeout after Args.
+    labels = [(m.start(), m.group(1)[:2].lower()) for m in _STEP_FIELD_RE.finditer(content)]
+    pos = 0
+
+    action_match = _match_field(_ACTION_RE, content, labels, "ac", pos)
     if action_match:
         step.action = action_match.group(1).strip()
-        content = content[action_match.end():]
+        pos = action_match.end()
     else:
         # Look for "Action poke::..." pattern
-        poke_action_match = re.search(r"Action\s+poke::([^\s\n]+)", content)
+        poke_action_match = _POKE_ACTION_RE.search(content)
         if poke_action_match:
             step.action = f"poke::{poke_action_match.group(1)}"
-            content = content[poke_action_match.end():]
+            pos = poke_action_match.end()
         else:
             # Use step name as default action
             step.action = step_name
 
-    # Extract Args
-    args_match = re.search(r"Args?:\s*([^\n]+?)(?=\s*$|\n|Timeout:|$)", content, re.IGNORECASE)
+    args_match = _match_field(_ARGS_RE, content, labels, "ar", pos)
     if args_match:
         args_text = args_match.group(1).strip()
         step.args = parse_step_args(args_text)
-        content = content[args_match.end():]
+        pos = args_match.end()
     else:
         # Try extracting individual arg lines
-        for arg_line in content.split("\n"):
+        for arg_line in content[pos:].split("\n"):
             arg_line = arg_line.strip()
             if arg_line.startswith("- ") or arg_line.startswith("-"):
                 key, value = parse_arg_line(arg_line)
                 if key and value:
                     step.args[key] = value
 
-    # Extract Timeout
-    timeout_match = re.search(r"Timeout:\s*(\d+)s?", content, re.IGNORECASE)
+    timeout_match = _match_field(_TIMEOUT_RE, content, labels, "ti", pos)
     if timeout_match:
         step.timeout_s = int(timeout_match.group(1))
 
@@ -250,7 +267,7 @@ def parse_step_args(text: str) -> Dict[str, Any]:
     args = {}
 
     # Split by dash followed by a word character
-    parts = re.split(r"-([a-zA-Z_][a-zA-Z0-9_]*)", text)
+    parts = _ARG_SPLIT_RE.split(text)
 
     i = 1
     while i < len(parts):
@@ -280,8 +297,8 @@ def parse_arg_line(line: str) -> tuple:
 
     line = line[1:].strip()  # Remove leading "- "
 
-    if ":" in line:
-        key, value = line.split(":", 1)
+    key, sep, value = line.partition(":")
+    if sep:
         return key.strip(), value.strip()
     else:
         tokens = line.split()
@@ -290,9 +307,9 @@ def parse_arg_line(line: str) -> tuple:
         return None, None
 
 
-def parse_skills_section(text: str) -> List[str]:
+def parse_skills_section(lines: List[str]) -> List[str]:
     """
-    Parse skills section for playbooks.
+    Parse skills section lines for playbooks.
 
     Format:
     - skill_name_1
@@ -300,8 +317,6 @@ def parse_skills_section(text: str) -> List[str]:
     """
     skills = []
 
-    lines = [line.strip() for line in text.strip().split("\n") if line.strip()]
-
     for line in lines:
         if line.startswith("- ") or line.startswith("-"):
             skill_name = line[1:].strip()
@@ -311,9 +326,9 @@ def parse_skills_section(text: str) -> List[str]:
     return skills
 
 
-def parse_defaults_section(text: str) -> PlaybookDefaults:
+def parse_defaults_section(lines: List[str]) -> PlaybookDefaults:
     """
-    Parse defaults section for playbooks.
+    Parse defaults section lines for playbooks.
 
     Format:
     - timeout_s: 60
@@ -323,8 +338,6 @@ def parse_defaults_section(text: str) -> PlaybookDefaults:
     """
     defaults = PlaybookDefaults()
 
-    lines = [line.strip() for line in text.strip().split("\n") if line.strip()]
-
     for line in lines:
         if line.startswith("- ") or line.startswith("-"):
             key_value = parse_arg_line(line)
@@ -339,7 +352,9 @@ def parse_defaults_section(text: str) -> PlaybookDefaults:
                 elif key == "session_mode":
                     value = value.strip().lower()
 
-                setattr(defaults, key, value)
+                # PlaybookDefaults is slotted; ignore unknown keys
+                if key in PlaybookDefaults.__dataclass_fields__:
+                    setattr(defaults, key, value)
 
     return defaults
 
@@ -386,22 +401,39 @@ class SkillLoader:
         """
         Load Skill from Markdown file.
 
+        Parsed skills are cached and reused until the file's mtime or size
+        changes, so the returned object is shared and must not be mutated.
+
         Args:
             skill_path: Path to skill file
 
         Returns:
             Skill object
         """
-        if not os.path.exists(skill_path):
-            raise FileNotFoundError(f"Skill not found: {skill_path}")
+        try:
+            st = os.stat(skill_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Skill not found: {skill_path}") from None
+
+        return SkillLoader._load_stat(skill_path, st)
+
+    @staticmethod
+    def _load_stat(skill_path: str, st: os.stat_result) -> Skill:
+        """Load Skill from a file already known to exist, given its stat"""
+        key = os.path.abspath(skill_path)
+        cached = _SKILL_CACHE.get(key)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
 
         data = parse_markdown_file(skill_path)
 
-        return Skill(
+        skill = Skill(
             name=data.get("name", "unnamed"),
             inputs_schema=data.get("inputs_schema"),
             steps=data.get("steps", []),
         )
+        _SKILL_CACHE[key] = (st.st_mtime_ns, st.st_size, skill)
+        return skill
 
     @staticmethod
     def load_from_directory(skill_dir: str) -> Dict[str, Skill]:
@@ -415,11 +447,13 @@ class SkillLoader:
             Dictionary mapping skill names to Skill objects
         """
         skills = {}
-        for filename in os.listdir(skill_dir):
-            filepath = os.path.join(skill_dir, filename)
-            if os.path.isfile(filepath) and filename.endswith(".md"):
+        with os.scandir(skill_dir) as it:
+            for entry in it:
+                filename = entry.name
+                if not filename.endswith(".md") or not entry.is_file():
+                    continue
                 try:
-                    skill = SkillLoader.load(filepath)
+                    skill = SkillLoader._load_stat(entry.path, entry.stat())
                     # Use filename (without .md) as key, not skill name from heading
                     skill_key = filename[:-3]
                     skills[skill_key] = skill
@@ -5,8 +5,10 @@ PSP (Playbook/Skill/Poke) schema definitions
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 
+from skillpilot.protocol import DATACLASS_SLOTS
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class SkillStep:
     """Single step in a skill"""
     name: str
@@ -15,7 +17,7 @@ class SkillStep:
     timeout_s: Optional[int] = None
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Skill:
     """Skill definition - contains steps that call poke actions"""
     name: str
@@ -23,7 +25,7 @@ class Skill:
     steps: List[SkillStep] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class PlaybookDefaults:
     """Default values for playbook"""
     timeout_s: Optional[int] = None
@@ -32,7 +34,7 @@ class PlaybookDefaults:
     session_mode: str = "shared"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Playbook:
     """Playbook definition - orchestrates skills"""
     name: str
@@ -1,6 +1,13 @@
 """SkillPilot Runner - PTY-based EDA tool executor"""
 
 from skillpilot.runner.core import Runner
-from skillpilot.runner.adapters import DemoToolAdapter
 
 __all__ = ["Runner", "DemoToolAdapter"]
+
+
+def __getattr__(name):
+    # Adapters are imported on first use rather than with the package
+    if name == "DemoToolAdapter":
+        from skillpilot.runner.adapters import DemoToolAdapter
+        return DemoToolAdapter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,13 +6,17 @@ Adapters provide the interface to different EDA tools.
 
 import os
 import pty
+import selectors
+import signal
 import subprocess
 import time
 from typing import Optional, List, Callable
 from dataclasses import dataclass, field
 
+from skillpilot.protocol import DATACLASS_SLOTS
 
-@dataclass
+
+@dataclass(**DATACLASS_SLOTS)
 class AdapterConfig:
     """Configuration for a tool adapter"""
     tool_name: str
@@ -23,6 +27,10 @@ class AdapterConfig:
     boot_commands: List[str] = field(default_factory=list)
     # Working directory for the tool
     workdir: str = field(default_factory=lambda: os.getcwd())
+    # Output that signals the tool accepts input (None: short fixed delay)
+    ready_pattern: Optional[bytes] = None
+    # Upper bound on waiting for ready_pattern at startup
+    ready_timeout_s: float = 5.0
 
 
 class ToolAdapter:
@@ -38,6 +46,10 @@ class ToolAdapter:
         self.slave_fd: Optional[int] = None
         self.process: Optional[subprocess.Popen] = None
         self.pid: Optional[int] = None
+        # Readiness selector for master_fd, registered once in start()
+        self._selector: Optional[selectors.BaseSelector] = None
+        # Output consumed while waiting for the tool to become ready
+        self.startup_output: bytes = b""
 
     def start(self) -> int:
         """
@@ -48,6 +60,8 @@ class ToolAdapter:
         """
         # Open PTY
         self.master_fd, self.slave_fd = pty.openpty()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.master_fd, selectors.EVENT_READ)
 
         # Start process with slave PTY as stdin/stdout/stderr
         self.process = subprocess.Popen(
@@ -57,7 +71,9 @@ class ToolAdapter:
             stderr=self.slave_fd,
             cwd=self.config.workdir,
             close_fds=True,
-            preexec_fn=os.setsid,  # New process group
+            # setsid() in the child without a preexec_fn, so CPython can keep
+            # its fast spawn path; the tool leads its own process group
+            start_new_session=True,
         )
 
         # Close slave FD (we use master)
@@ -66,15 +82,43 @@ class ToolAdapter:
 
         self.pid = self.process.pid
 
-        # Wait for tool to be ready (simple approach: give it time to start)
-        time.sleep(0.5)
+        # Wait for tool to be ready
+        self.startup_output = self._wait_ready()
 
-        # Run boot commands
-        for cmd in self.config.boot_commands:
-            self.write(cmd)
+        # Run boot commands, submitted to the PTY in a single write
+        if self.config.boot_commands:
+            self.write("".join(self.config.boot_commands))
 
         return self.pid
 
+    def _wait_ready(self) -> bytes:
+        """
+        Wait until the tool prints config.ready_pattern or the timeout elapses.
+
+        Returns:
+            Output read from the tool while waiting
+        """
+        pattern = self.config.ready_pattern
+        if not pattern:
+            time.sleep(0.05)
+            return b""
+
+        buffer = bytearray()
+        deadline = time.monotonic() + self.config.ready_timeout_s
+        while pattern not in buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self._selector.select(remaining):
+                try:
+                    data = os.read(self.master_fd, 4096)
+                except OSError:
+                    break  # Tool exited during startup (EIO on Linux)
+                if not data:
+                    break
+                buffer += data
+        return bytes(buffer)
+
     def write(self, data: str) -> None:
         """
         Write data to the tool.
@@ -87,6 +131,17 @@ class ToolAdapter:
 
         os.write(self.master_fd, data.encode('utf-8'))
 
+    def fileno(self) -> int:
+        """
+        Return the PTY master fd, for callers that select() on it directly.
+
+        Returns:
+            File descriptor of the PTY master
+        """
+        if self.master_fd is None:
+            raise RuntimeError("Tool not started")
+        return self.master_fd
+
     def read(self, timeout: float = 0.1, size: int = 4096) -> bytes:
         """
         Read data from the tool.
@@ -101,33 +156,30 @@ class ToolAdapter:
         if self.master_fd is None:
             raise RuntimeError("Tool not started")
 
-        import select
-        ready, _, _ = select.select([self.master_fd], [], [], timeout)
-
-        if ready:
+        if self._selector.select(timeout):
             return os.read(self.master_fd, size)
         return b''
 
-    def send_signal(self, signal: int) -> None:
+    def send_signal(self, signum: int) -> None:
         """
         Send a signal to the tool process.
 
         Args:
-            signal: Signal number (e.g., signal.SIGINT, signal.SIGTERM)
+            signum: Signal number (e.g., signal.SIGINT, signal.SIGTERM)
         """
         if self.process is None:
             raise RuntimeError("Tool not started")
 
-        # Send signal to process group
+        # Send signal to process group (the tool is its session leader, so
+        # the group id is its pid)
         try:
-            os.killpg(os.getpgid(self.process.pid), signal)
+            os.killpg(self.process.pid, signum)
         except ProcessLookupError:
             pass  # Process already terminated
 
     def terminate(self) -> None:
         """Terminate the tool process gracefully"""
         if self.process is not None:
-            import signal
             self.send_signal(signal.SIGTERM)
             try:
                 self.process.wait(timeout=5)
@@ -137,7 +189,6 @@ class ToolAdapter:
     def kill(self) -> None:
         """Force kill the tool process"""
         if self.process is not None:
-            import signal
             self.send_signal(signal.SIGKILL)
             try:
                 self.process.wait(timeout=2)
@@ -146,6 +197,9 @@ class ToolAdapter:
 
     def close(self) -> None:
         """Close PTY and cleanup"""
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
         if self.master_fd is not None:
             os.close(self.master_fd)
             self.master_fd = None
@@ -190,6 +244,7 @@ class DemoToolAdapter(ToolAdapter):
             tool_version="1.0",
             command=["python3", demo_tool_path],
             workdir=workdir or os.getcwd(),
+            ready_pattern=b"Ready.",
         )
 
         return cls(config)
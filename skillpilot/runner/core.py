@@ -11,8 +11,8 @@ import time
 import uuid
 import select
 import signal
-from typing import Optional, List, Dict, Any, Callable
-from datetime import datetime
+import threading
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Set, Tuple
 
 from skillpilot.protocol import (
     CommandRequest,
@@ -24,11 +24,15 @@ from skillpilot.protocol import (
     StopRequest,
     LeaseInfo,
     write_atomic_json,
+    write_nonatomic_json,
     read_json,
     get_current_timestamp_ms,
-    DEFAULT_MARKER_PREFIX,
 )
-from skillpilot.runner.adapters import ToolAdapter, AdapterConfig
+from skillpilot.watch import DirWatcher, IN_CLOSE_WRITE, IN_CREATE, IN_MOVED_TO
+
+if TYPE_CHECKING:
+    # Adapters (pty/subprocess) load only once main() or a caller picks one
+    from skillpilot.runner.adapters import ToolAdapter
 
 
 class Runner:
@@ -63,12 +67,24 @@ class Runner:
     FILE_CANCEL = "cancel.json"
     FILE_STOP = "stop.json"
 
+    # Longest idle sleep between control-file checks; bounds how late an
+    # expired lease is noticed when no file changes wake the loop
+    IDLE_WAKE_S = 1.0
+
+    # Minimum spacing of control-file checks while a command runs
+    CTL_CHECK_INTERVAL_S = 0.5
+
+    # Flush cadence for output/ and session.out while a command runs
+    LOG_FLUSH_INTERVAL_S = 0.5
+
     def __init__(
         self,
         session_dir: str,
-        adapter: ToolAdapter,
+        adapter: "ToolAdapter",
         heartbeat_interval_s: float = 5.0,
         enable_lease: bool = True,
+        inflight_mode: str = "rename",
+        exit_when_idle: bool = False,
     ):
         """
         Initialize Runner.
@@ -78,23 +94,53 @@ class Runner:
             adapter: Tool adapter to manage PTY connection
             heartbeat_interval_s: Interval for heartbeat updates
             enable_lease: Whether to enforce lease expiration
+            inflight_mode: "rename" moves running commands to inflight/;
+                "marker" leaves them queued behind an inflight/ marker file
+            exit_when_idle: Stop as soon as a queue scan finds nothing to run
         """
+        if inflight_mode not in ("rename", "marker"):
+            raise ValueError(f"Unknown inflight_mode: {inflight_mode}")
+
         self.session_dir = os.path.abspath(session_dir)
+
+        # Fixed session paths, joined once instead of per check/write
+        self.path_queue = self._get_path(self.DIR_QUEUE)
+        self.path_result = self._get_path(self.DIR_RESULT)
+        self.path_inflight = self._get_path(self.DIR_INFLIGHT)
+        self.path_output = self._get_path(self.DIR_OUTPUT)
+        self.path_cancel = self._get_path(self.DIR_CTL, self.FILE_CANCEL)
+        self.path_stop = self._get_path(self.DIR_CTL, self.FILE_STOP)
+        self.path_lease = self._get_path(self.DIR_STATE, self.FILE_LEASE)
+        self.path_state = self._get_path(self.DIR_STATE, self.FILE_STATE)
+        self.path_heartbeat = self._get_path(self.DIR_STATE, self.FILE_HEARTBEAT)
+        self.path_session_out = self._get_path(self.DIR_LOG, self.FILE_SESSION_OUT)
         self.adapter = adapter
         self.heartbeat_interval_s = heartbeat_interval_s
         self.enable_lease = enable_lease
+        self.inflight_mode = inflight_mode
+        self.exit_when_idle = exit_when_idle
 
         self.session_id: str = str(uuid.uuid4())
         self.runner_pid: int = os.getpid()
         self.state: Optional[SessionState] = None
         self.stopping: bool = False
 
-        # Output buffer for marker detection (supports chunks)
-        self.output_buffer: List[bytes] = []
+        # Last len(marker)-1 output bytes, for markers split across chunks;
+        # reused across commands and updated in place
+        self._scan_buf = bytearray()
 
         # Session log file handle
         self.session_log_file = None
 
+        # cmd_ids with a result file, seeded from result/ in run()
+        self._completed_cmd_ids: Set[str] = set()
+
+        # Control file path -> ((mtime_ns, size, ino), parsed object)
+        self._ctl_cache: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+
+        # Change notification for queue/ctl/state, set up in run()
+        self._watcher: Optional[DirWatcher] = None
+
         # Command execution state (for M2 governance)
         self.current_cmd: Optional[CommandRequest] = None
         self.cancel_requested: bool = False
@@ -118,6 +164,20 @@ class Runner:
         for d in dirs:
             os.makedirs(self._get_path(d), exist_ok=True)
 
+    def _init_watches(self) -> DirWatcher:
+        """Watch queue/, ctl/ and state/lease.json for files written or renamed in"""
+        watcher = DirWatcher()
+        # Master writes queue files via link() (IN_CREATE); tmp+rename and
+        # plain writes show up as IN_MOVED_TO / IN_CLOSE_WRITE
+        watcher.add_watch(self.path_queue, IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+        watcher.add_watch(self._get_path(self.DIR_CTL), IN_CLOSE_WRITE | IN_MOVED_TO)
+        # The Runner itself rewrites state.json and heartbeat.json here; only
+        # the lease comes from outside
+        watcher.add_watch(
+            self._get_path(self.DIR_STATE), IN_CLOSE_WRITE | IN_MOVED_TO, names=[self.FILE_LEASE]
+        )
+        return watcher
+
     def _write_state(self, phase: RunnerPhase, current_cmd_id: Optional[str] = None) -> None:
         """Write current state to state file"""
         state = SessionState(
@@ -128,14 +188,21 @@ class Runner:
             current_cmd_id=current_cmd_id,
             updated_at=get_current_timestamp_ms(),
         )
-        write_atomic_json(self._get_path(self.DIR_STATE, self.FILE_STATE), state.to_dict())
+        path = self.path_state
+        if phase in (RunnerPhase.ERROR, RunnerPhase.STOPPING):
+            # Final states must never be observed half-written
+            write_atomic_json(path, state.to_dict())
+        else:
+            # Per-command BUSY/IDLE flips are superseded quickly
+            write_nonatomic_json(path, state.to_dict())
         self.state = state
 
     def _write_heartbeat(self) -> None:
         """Write heartbeat file"""
         heartbeat = {"timestamp": get_current_timestamp_ms()}
-        write_atomic_json(
-            self._get_path(self.DIR_STATE, self.FILE_HEARTBEAT),
+        # Liveness only needs to be recent, not atomic or durable
+        write_nonatomic_json(
+            self.path_heartbeat,
             heartbeat
         )
 
@@ -143,37 +210,132 @@ class Runner:
         """Append data to session.out log file"""
         if self.session_log_file is None:
             self.session_log_file = open(
-                self._get_path(self.DIR_LOG, self.FILE_SESSION_OUT),
+                self.path_session_out,
                 "ab"
             )
         self.session_log_file.write(data)
-        self.session_log_file.flush()
 
-    def _scan_queue(self) -> List[CommandRequest]:
+    def _flush_logs(self) -> None:
+        """Flush buffered session.out data (command boundaries, heartbeat)"""
+        if self.session_log_file is not None:
+            self.session_log_file.flush()
+
+    def _scan_queue(self) -> Optional[CommandRequest]:
         """
-        Scan queue directory for command files.
+        Scan queue directory for the next command.
+
+        Only the first readable file (by filename order) is parsed.
 
         Returns:
-            List of pending commands sorted by filename
+            Next pending command, or None if the queue is empty
         """
-        queue_dir = self._get_path(self.DIR_QUEUE)
-        if not os.path.exists(queue_dir):
-            return []
-
-        commands = []
-        for filename in sorted(os.listdir(queue_dir)):
-            if filename.startswith("cmd_") and filename.endswith(".json"):
-                filepath = os.path.join(queue_dir, filename)
-                try:
-                    data = read_json(filepath)
-                    if data:
-                        cmd = CommandRequest.from_dict(data)
-                        commands.append(cmd)
-                except Exception as e:
-                    # Log error but continue
-                    print(f"Error reading {filename}: {e}", file=sys.stderr)
+        queue_dir = self.path_queue
+        try:
+            with os.scandir(queue_dir) as it:
+                names = sorted(
+                    e.name for e in it
+                    if e.name.startswith("cmd_") and e.name.endswith(".json")
+                )
+        except FileNotFoundError:
+            return None
+
+        inflight_dir = self.path_inflight
+        for filename in names:
+            # Marker mode: queue file stays put while its command runs
+            if self.inflight_mode == "marker" and os.path.exists(os.path.join(inflight_dir, filename)):
+                continue
+            try:
+                data = read_json(os.path.join(queue_dir, filename))
+                if data:
+                    return CommandRequest.from_dict(data)
+            except Exception as e:
+                # Log error but continue
+                print(f"Error reading {filename}: {e}", file=sys.stderr)
+
+        return None
+
+    def _load_completed(self) -> None:
+        """Seed the completed-command set from existing result files"""
+        self._completed_cmd_ids.clear()
+        try:
+            with os.scandir(self.path_result) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.startswith("cmd_") and name.endswith(".json"):
+                        # cmd_<seq>_<cmd_id>.json
+                        self._completed_cmd_ids.add(name[4:-5].partition("_")[2])
+        except FileNotFoundError:
+            pass
+
+    def _previous_runner_alive(self) -> bool:
+        """
+        Check whether the runner recorded in state.json is still running.
 
-        return commands
+        Returns:
+            True if another live runner owns this session
+        """
+        try:
+            state = read_json(self.path_state)
+        except ValueError:
+            return True  # Being rewritten in place: its writer is alive
+        if not state or state.get("phase") in (RunnerPhase.STOPPING, RunnerPhase.ERROR):
+            return False
+        pid = state.get("runner_pid")
+        if not pid or pid == self.runner_pid:
+            return False
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _recover_inflight(self) -> None:
+        """
+        Resolve commands left in flight by a runner that died mid-command.
+
+        Without this a stale inflight/ entry is never retried (rename mode)
+        or makes every scan skip its queue file (marker mode). The command
+        may have partly run, so it is not re-queued: it gets an error result
+        with exit_reason "runner_died" and its inflight/ and queue/ files
+        are removed.
+        """
+        try:
+            with os.scandir(self.path_inflight) as it:
+                names = [
+                    e.name for e in it
+                    if e.name.startswith("cmd_") and e.name.endswith(".json")
+                ]
+        except FileNotFoundError:
+            return
+        if not names:
+            return
+        if self._previous_runner_alive():
+            print("Another runner is active; leaving inflight/ alone", file=sys.stderr)
+            return
+
+        now = get_current_timestamp_ms()
+        for name in names:
+            # cmd_<seq>_<cmd_id>.json
+            cmd_id = name[4:-5].partition("_")[2]
+            if cmd_id not in self._completed_cmd_ids:
+                result = CommandResult(
+                    cmd_id=cmd_id,
+                    status=CommandStatus.ERROR,
+                    start_ts=now,
+                    end_ts=now,
+                    exit_reason="runner_died",
+                    output_path=f"{self.path_output}/{name[:-5]}.out",
+                )
+                write_atomic_json(f"{self.path_result}/{name}", result.to_dict())
+                self._completed_cmd_ids.add(cmd_id)
+                print(f"Command {cmd_id} was interrupted by a runner exit", file=sys.stderr)
+            for path in (f"{self.path_inflight}/{name}", f"{self.path_queue}/{name}"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
 
     def _check_result_exists(self, cmd_id: str) -> bool:
         """
@@ -185,52 +347,50 @@ class Runner:
         Returns:
             True if result file exists
         """
-        result_dir = self._get_path(self.DIR_RESULT)
-        for filename in os.listdir(result_dir) if os.path.exists(result_dir) else []:
-            if filename.endswith(".json") and cmd_id in filename:
-                return True
-        return False
+        return cmd_id in self._completed_cmd_ids
 
-    def _check_control_files(self) -> tuple[Optional[CancelRequest], Optional[StopRequest], Optional[LeaseInfo]]:
+    def _read_control(self, path: str, cls: Any) -> Any:
         """
-        Check for control files (cancel, stop, lease).
+        Parse a control file, reusing the cached object while it is unchanged.
+
+        Args:
+            path: Control file path
+            cls: Protocol class providing from_dict()
 
         Returns:
-            Tuple of (cancel_req, stop_req, lease_info)
+            Parsed object, or None if the file is missing or invalid
         """
-        cancel = None
-        stop = None
-        lease = None
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._ctl_cache.pop(path, None)
+            return None
 
-        # Check cancel.json
-        cancel_path = self._get_path(self.DIR_CTL, self.FILE_CANCEL)
-        if os.path.exists(cancel_path):
-            try:
-                data = read_json(cancel_path)
-                if data:
-                    cancel = CancelRequest.from_dict(data)
-            except Exception:
-                pass
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cached = self._ctl_cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
 
-        # Check stop.json
-        stop_path = self._get_path(self.DIR_CTL, self.FILE_STOP)
-        if os.path.exists(stop_path):
-            try:
-                data = read_json(stop_path)
-                if data:
-                    stop = StopRequest.from_dict(data)
-            except Exception:
-                pass
+        obj = None
+        try:
+            data = read_json(path)
+            if data:
+                obj = cls.from_dict(data)
+        except Exception:
+            pass
+        self._ctl_cache[path] = (key, obj)
+        return obj
 
-        # Check lease.json
-        lease_path = self._get_path(self.DIR_STATE, self.FILE_LEASE)
-        if os.path.exists(lease_path):
-            try:
-                data = read_json(lease_path)
-                if data:
-                    lease = LeaseInfo.from_dict(data)
-            except Exception:
-                pass
+    def _check_control_files(self) -> tuple[Optional[CancelRequest], Optional[StopRequest], Optional[LeaseInfo]]:
+        """
+        Check for control files (cancel, stop, lease).
+
+        Returns:
+            Tuple of (cancel_req, stop_req, lease_info)
+        """
+        cancel = self._read_control(self.path_cancel, CancelRequest)
+        stop = self._read_control(self.path_stop, StopRequest)
+        lease = self._read_control(self.path_lease, LeaseInfo)
 
         return cancel, stop, lease
 
@@ -255,33 +415,49 @@ class Runner:
         self.cancel_handled = False
 
         # Open output file
-        output_file = open(output_path, "wb")
+        output_file = open(output_path, "wb", buffering=65536)
 
         # Reset output buffer
-        self.output_buffer = []
+        scan_buf = self._scan_buf
+        scan_buf[:] = b"\n"  # Lets a marker on the very first line match
 
         # Write payload to PTY
         payload = cmd.payload
 
-        # Inject marker if in runner_inject mode
+        # Inject marker if in runner_inject mode. The Tcl "\n" puts the marker
+        # at the start of a line even when the payload left the cursor
+        # mid-line (puts -nonewline, a prompt); the PTY echo of this line
+        # carries a literal backslash-n instead, so it never matches below.
         marker_text = ""
         if cmd.marker.mode == "runner_inject":
-            marker_text = f'puts "{cmd.marker.prefix} {cmd.marker.token}"\n'
+            marker_text = f'puts "\\n{cmd.marker.prefix} {cmd.marker.token}"\n'
             payload += marker_text
 
         self.adapter.write(payload)
 
-        # Read output until marker detected or timeout
-        marker_pattern = f"{cmd.marker.prefix} {cmd.marker.token}".encode('utf-8')
+        # Read output until marker detected or timeout. Match it only at the
+        # start of a line: the PTY echoes the injected `puts "<marker>"`
+        # back, and that echo must not count as completion.
+        marker_pattern = f"\n{cmd.marker.prefix} {cmd.marker.token}".encode('utf-8')
+        carry_len = len(marker_pattern) - 1
         marker_found = False
-        buffer = b""
 
-        start_time = time.time()
+        # Monotonic clock for timeout math: immune to wall-clock jumps
+        monotonic = time.monotonic
+        start_time = monotonic()
         timeout = cmd.timeout_s or 300  # Default 5 minutes
+        last_ctl_check = 0.0
+        last_flush = start_time
+
+        pty_fd = self.adapter.fileno()
+        watch_fd = self._watcher.fileno() if self._watcher is not None else None
+        wait_fds = [pty_fd] if watch_fd is None else [pty_fd, watch_fd]
 
         while not marker_found and not self.stopping:
+            now = monotonic()
+
             # Check timeout
-            if time.time() - start_time > timeout:
+            if now - start_time > timeout:
                 output_file.close()
                 self.current_cmd = None
                 return CommandResult(
@@ -294,63 +470,87 @@ class Runner:
                 )
 
             # Check control files periodically (M2)
-            cancel, stop, lease = self._check_control_files()
-
-            # Handle stop
-            if stop is not None:
-                self.stopping = True
-                break
-
-            # Handle lease expiration
-            if self.enable_lease and lease is not None and lease.is_expired():
-                print("Lease expired during command execution", file=sys.stderr)
-                self.stopping = True
-                break
-
-            # Handle cancel request (M2 - full implementation)
-            if cancel is not None:
-                # Check if this command should be cancelled
-                if cancel.scope == "current" or cancel.cmd_id == cmd.cmd_id:
-                    if not self.cancel_requested:
-                        self.cancel_requested = True
-                        print(f"Cancel requested for command {cmd.cmd_id}", file=sys.stderr)
-
-                        # Execute cancel policy
-                        if cmd.cancel_policy == "ctrl_c":
-                            # Send Ctrl-C (\x03)
-                            self.adapter.write("\x03")
-                            self.cancel_handled = True
-                            # Give it time to react, then break
-                            time.sleep(0.5)
-                            break
-                        elif cmd.cancel_policy == "terminate_tool":
-                            self.adapter.terminate()
-                            time.sleep(1)
-                            break
-                        elif cmd.cancel_policy == "terminate_session":
-                            self.adapter.kill()
-                            self.stopping = True
-                            break
-
-            # Read from PTY
-            try:
-                data = self.adapter.read(timeout=0.1, size=4096)
-                if data:
-                    output_file.write(data)
-                    output_file.flush()
+            if now - last_ctl_check >= self.CTL_CHECK_INTERVAL_S:
+                last_ctl_check = now
+                cancel, stop, lease = self._check_control_files()
 
-                    # Append to session log
-                    self._append_session_log(data)
+                # Handle stop
+                if stop is not None:
+                    self.stopping = True
+                    break
 
-                    # Check for marker (may span chunks)
-                    buffer += data
-                    if marker_pattern in buffer:
-                        marker_found = True
-                        break
+                # Handle lease expiration
+                if self.enable_lease and lease is not None and lease.is_expired():
+                    print("Lease expired during command execution", file=sys.stderr)
+                    self.stopping = True
+                    break
+
+                # Handle cancel request (M2 - full implementation)
+                if cancel is not None:
+                    # Check if this command should be cancelled
+                    if cancel.scope == "current" or cancel.cmd_id == cmd.cmd_id:
+                        if not self.cancel_requested:
+                            self.cancel_requested = True
+                            print(f"Cancel requested for command {cmd.cmd_id}", file=sys.stderr)
+
+                            # Execute cancel policy
+                            if cmd.cancel_policy == "ctrl_c":
+                                # Send Ctrl-C (\x03)
+                                self.adapter.write("\x03")
+                                self.cancel_handled = True
+                                # Give it time to react, then break
+                                time.sleep(0.5)
+                                break
+                            elif cmd.cancel_policy == "terminate_tool":
+                                self.adapter.terminate()
+                                time.sleep(1)
+                                break
+                            elif cmd.cancel_policy == "terminate_session":
+                                self.adapter.kill()
+                                self.stopping = True
+                                break
+
+            # Sleep until tool output, a control-file change, or the next
+            # timeout/control check, whichever comes first
+            wait_s = min(timeout - (monotonic() - start_time), self.CTL_CHECK_INTERVAL_S)
+            ready, _, _ = select.select(wait_fds, [], [], max(0.0, wait_s))
+            if watch_fd is not None and watch_fd in ready and self._watcher.wait(0):
+                last_ctl_check = 0.0  # Re-check control files right away
+            if pty_fd not in ready:
+                continue
+
+            # Read from PTY (a whole pipe buffer per syscall)
+            try:
+                data = os.read(pty_fd, 65536)
+                if not data:
+                    raise OSError("tool output closed")
+                output_file.write(data)
 
-                    # Keep buffer limited
-                    if len(buffer) > 8192:
-                        buffer = buffer[-8192:]
+                # Append to session log
+                self._append_session_log(data)
+
+                # Flush periodically so live output can be tailed;
+                # close() flushes the rest when the command ends
+                if now - last_flush >= self.LOG_FLUSH_INTERVAL_S:
+                    output_file.flush()
+                    self._flush_logs()
+                    last_flush = now
+
+                # Check for marker: search the chunk itself without copying
+                # it, then the seam with the carried tail of the previous one
+                if data.find(marker_pattern) >= 0:
+                    marker_found = True
+                    break
+                scan_buf += data[:carry_len]
+                if scan_buf.find(marker_pattern) >= 0:
+                    marker_found = True
+                    break
+
+                # Carry only the bytes a split marker could start in
+                if len(data) >= carry_len:
+                    scan_buf[:] = data[len(data) - carry_len:]
+                else:
+                    del scan_buf[:-carry_len]
 
             except OSError as e:
                 # Tool likely died
@@ -390,7 +590,11 @@ class Runner:
 
     def _move_to_inflight(self, cmd: CommandRequest) -> str:
         """
-        Move command file to inflight directory.
+        Mark a command as inflight.
+
+        In "rename" mode the queue file is moved to inflight/. In "marker"
+        mode an empty inflight/ marker is created exclusively and the queue
+        file stays in place until the command completes.
 
         Args:
             cmd: Command to move
@@ -398,10 +602,12 @@ class Runner:
         Returns:
             Path to inflight file
         """
-        src_filename = f"cmd_{cmd.seq}_{cmd.cmd_id}.json"
-        src_path = self._get_path(self.DIR_QUEUE, src_filename)
-        inflight_path = self._get_path(self.DIR_INFLIGHT, src_filename)
-        os.rename(src_path, inflight_path)
+        filename = f"cmd_{cmd.seq}_{cmd.cmd_id}.json"
+        inflight_path = f"{self.path_inflight}/{filename}"
+        if self.inflight_mode == "marker":
+            open(inflight_path, "x").close()
+        else:
+            os.replace(f"{self.path_queue}/{filename}", inflight_path)
         return inflight_path
 
     def _remove_from_inflight(self, cmd: CommandRequest) -> None:
@@ -412,11 +618,14 @@ class Runner:
             cmd: Command to remove
         """
         filename = f"cmd_{cmd.seq}_{cmd.cmd_id}.json"
-        inflight_path = self._get_path(self.DIR_INFLIGHT, filename)
-        try:
-            os.remove(inflight_path)
-        except OSError:
-            pass
+        paths = [f"{self.path_inflight}/{filename}"]
+        if self.inflight_mode == "marker":
+            paths.append(f"{self.path_queue}/{filename}")
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
     def run(self) -> None:
         """
@@ -437,28 +646,48 @@ class Runner:
         print(f"Session directory: {self.session_dir}", file=sys.stderr)
 
         self._create_session_dir()
+        self._load_completed()
+        # Before STARTING overwrites the previous runner's state.json
+        self._recover_inflight()
         self._write_state(RunnerPhase.STARTING)
 
         # Start tool
         tool_pid = self.adapter.start()
         print(f"Tool started with PID: {tool_pid}", file=sys.stderr)
 
+        # Keep the startup banner in the audit log
+        if self.adapter.startup_output:
+            self._append_session_log(self.adapter.startup_output)
+
         self._write_state(RunnerPhase.IDLE)
 
         # Main loop
-        last_heartbeat = time.time()
+        self._watcher = self._init_watches()
+        queue_dir = self.path_queue
+        queue_dirty = True  # Rescan only after a queue change
+
+        # Bound once: the loop runs for the whole session
+        monotonic = time.monotonic
+        check_ctl = self._check_control_files
+        scan_queue = self._scan_queue
+        write_heartbeat = self._write_heartbeat
+        wait_for_change = self._watcher.wait
+        heartbeat_interval_s = self.heartbeat_interval_s
+
+        last_heartbeat = monotonic()
 
         try:
             while not self.stopping:
-                current_time = time.time()
+                current_time = monotonic()
 
                 # Update heartbeat periodically
-                if current_time - last_heartbeat >= self.heartbeat_interval_s:
-                    self._write_heartbeat()
+                if current_time - last_heartbeat >= heartbeat_interval_s:
+                    write_heartbeat()
+                    self._flush_logs()
                     last_heartbeat = current_time
 
                 # Check control files
-                cancel, stop, lease = self._check_control_files()
+                cancel, stop, lease = check_ctl()
 
                 if stop is not None:
                     print(f"🛑 Stop requested: {stop.mode}")
@@ -476,18 +705,14 @@ class Runner:
                 if self.enable_lease and lease is not None and lease.is_expired():
                     print(f"🔴 Lease expired, stopping...")
                     self.stopping = True
-            # Graceful: wait for current command to finish
-            if self.state and self.state.phase == RunnerPhase.BUSY:
-                print(f"⏳ Waiting for current command: {self.state.current_cmd_id}")
-                print(f"   Current phase: {self.state.phase.value}")
 
-                # Scan queue for commands
-                commands = self._scan_queue()
+                if self.stopping:
+                    break
 
-                if commands:
-                    # Process next command
-                    cmd = commands[0]
+                # Scan queue for the next command
+                cmd = scan_queue() if queue_dirty else None
 
+                if cmd is not None:
                     # Check if result already exists (idempotent)
                     if not self._check_result_exists(cmd.cmd_id):
                         print(f"Executing command: {cmd.cmd_id}", file=sys.stderr)
@@ -497,26 +722,48 @@ class Runner:
                         inflight_path = self._move_to_inflight(cmd)
 
                         # Prepare output path
-                        output_filename = f"cmd_{cmd.seq}_{cmd.cmd_id}.out"
-                        output_path = self._get_path(self.DIR_OUTPUT, output_filename)
+                        stem = f"cmd_{cmd.seq}_{cmd.cmd_id}"
+                        output_path = f"{self.path_output}/{stem}.out"
 
                         try:
                             # Execute command
                             result = self._execute_command(cmd, output_path)
 
+                            # Session log must be complete once the result is visible
+                            self._flush_logs()
+
                             # Write result file
-                            result_filename = f"cmd_{cmd.seq}_{cmd.cmd_id}.json"
-                            result_path = self._get_path(self.DIR_RESULT, result_filename)
+                            result_path = f"{self.path_result}/{stem}.json"
                             write_atomic_json(result_path, result.to_dict())
+                            self._completed_cmd_ids.add(cmd.cmd_id)
 
                             print(f"Command {cmd.cmd_id} completed: {result.status}", file=sys.stderr)
                         finally:
                             self._remove_from_inflight(cmd)
+                    else:
+                        # Already executed: drop the duplicate so the queue advances
+                        try:
+                            os.remove(f"{queue_dir}/cmd_{cmd.seq}_{cmd.cmd_id}.json")
+                        except OSError:
+                            pass
 
                     self._write_state(RunnerPhase.IDLE)
+                    # More commands may be queued; rescan without sleeping
+                    continue
+
+                if self.exit_when_idle and queue_dirty:
+                    print("Queue drained, exiting", file=sys.stderr)
+                    break
+
+                queue_dirty = False
 
-                # Small sleep to avoid busy polling
-                time.sleep(0.1)
+                # Sleep until a watched directory changes or the next heartbeat
+                timeout = min(
+                    heartbeat_interval_s - (monotonic() - last_heartbeat),
+                    self.IDLE_WAKE_S,
+                )
+                if queue_dir in wait_for_change(timeout):
+                    queue_dirty = True
 
         except KeyboardInterrupt:
             print("\nInterrupted by Ctrl-C, stopping...", file=sys.stderr)
@@ -532,6 +779,9 @@ class Runner:
             print("Runner stopping...", file=sys.stderr)
             self._write_state(RunnerPhase.STOPPING)
 
+            if self._watcher is not None:
+                self._watcher.close()
+
             # Close session log
             if self.session_log_file:
                 self.session_log_file.close()
@@ -542,3 +792,56 @@ class Runner:
 
             print("Runner stopped", file=sys.stderr)
 
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run a Runner session from the command line.
+
+    Usage: python -m skillpilot.runner.core --session-dir DIR [--adapter demo] [--exit-when-idle]
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SkillPilot Runner")
+    parser.add_argument("--session-dir", required=True, help="Session directory")
+    parser.add_argument("--adapter", default="demo", choices=["demo"], help="Tool adapter")
+    parser.add_argument("--heartbeat-interval", type=float, default=5.0, help="Heartbeat interval (seconds)")
+    parser.add_argument("--disable-lease", action="store_true", help="Disable lease expiration")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Exit once the queue is drained")
+    args = parser.parse_args(argv)
+
+    # Resolve once; Runner and adapter share the same absolute path
+    session_dir = os.path.abspath(args.session_dir)
+
+    if args.adapter == "demo":
+        from skillpilot.runner.adapters import DemoToolAdapter
+        adapter = DemoToolAdapter.create(workdir=session_dir)
+
+    runner = Runner(
+        session_dir=session_dir,
+        adapter=adapter,
+        heartbeat_interval_s=args.heartbeat_interval,
+        enable_lease=not args.disable_lease,
+        exit_when_idle=args.exit_when_idle,
+    )
+
+    # SIGTERM: leave the loop normally so the tool is terminated too
+    def _on_sigterm(signum, frame):
+        runner.stopping = True
+
+    # Handlers can only be installed from the main thread; embedders that
+    # run main() in a worker thread stop the runner via stop.json instead
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _on_sigterm)
+
+    try:
+        runner.run()
+    except Exception as e:
+        print(f"Runner failed: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
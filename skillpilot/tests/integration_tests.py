@@ -9,33 +9,285 @@ Tests cover all 7 acceptance criteria:
 5. Lease expiration
 6. Recovery after restart
 7. Audit logging
+
+plus recovery of commands left in flight by a dead runner (test 8).
 """
 
+import concurrent.futures
+import contextlib
+import io
+import json
+import mmap
 import os
+import re
 import sys
 import time
 import tempfile
 import shutil
 import subprocess
 import signal
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# run_runner() runs the runner in-process; spawned runners get
+# PYTHONPATH instead (see spawn_runner)
+sys.path.insert(0, ROOT_DIR)
+
+# Imported once here so forked test workers inherit the loaded modules
+from skillpilot.runner.adapters import DemoToolAdapter
+from skillpilot.runner.core import Runner, main as runner_main
+from skillpilot.watch import DirWatcher, IN_CREATE, IN_MOVED_TO
+
+# Keep session files in RAM when tmpfs is available; they only need to
+# live until cleanup()
+TMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# Environment for spawned runners: importable from any cwd, no .pyc
+# writes for throwaway runs, unbuffered output
+RUNNER_ENV = dict(
+    os.environ,
+    PYTHONPATH=os.pathsep.join(filter(None, [ROOT_DIR, os.environ.get("PYTHONPATH")])),
+    PYTHONDONTWRITEBYTECODE="1",
+    PYTHONUNBUFFERED="1",
+)
+if TMP_ROOT:
+    RUNNER_ENV["TMPDIR"] = TMP_ROOT
+
+# Fields shared by every queued test command
+BASE_CMD = {
+    "kind": "tcl",
+    "timeout_s": 10,
+    "cancel_policy": "ctrl_c",
+    "marker": {"prefix": "__SP_DONE__", "mode": "runner_inject"},
+}
+
+AUDIT_RE = re.compile(rb"Audit test (\d)")
+
+# How long run_runner() waits for a timed-out runner to honor stop.json
+RUNNER_STOP_GRACE_S = 5
+
+# How long kill_fast() waits after SIGTERM before SIGKILL
+RUNNER_TERM_GRACE_S = Runner.IDLE_WAKE_S + 1
+
+
+SESSION_SUBDIRS = ("queue", "result", "output", "log", "state", "ctl")
+
+
+@dataclass(frozen=True)
+class SessionLayout:
+    """Paths of a test session directory, joined once at construction"""
+
+    root: str
+    queue: str = field(init=False)
+    result: str = field(init=False)
+    output: str = field(init=False)
+    log: str = field(init=False)
+    ctl: str = field(init=False)
+    state: str = field(init=False)
+    inflight: str = field(init=False)
+
+    def __post_init__(self):
+        # Frozen: assign through object.__setattr__
+        for name in (*SESSION_SUBDIRS, "inflight"):
+            object.__setattr__(self, name, os.path.join(self.root, name))
+
+
+def skip(reason):
+    """Mark a test as disabled; main() reports it without running it"""
+    def deco(fn):
+        fn._skipped = reason
+        return fn
+    return deco
+
+
+def write_bytes(path, data):
+    """Write a small payload with one raw write() (no text/buffer layers)"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def dump_compact(data):
+    """Serialize to compact JSON bytes"""
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def write_json_atomic(path, data):
+    """Write compact JSON via tmp + rename so the runner never sees a partial file"""
+    tmp_path = path + ".tmp"
+    write_bytes(tmp_path, dump_compact(data))
+    os.replace(tmp_path, path)
+
+
+def write_queue(queue_dir, cmds):
+    """
+    Publish a batch of commands at once.
+
+    Writes {filename: cmd} into a staging directory and renames it over the
+    (empty) queue directory, so a runner sees either none or all of them.
+    Only for runners not started yet: a running one watches the old inode.
+    """
+    staging = queue_dir + ".new"
+    os.makedirs(staging)
+    for name, cmd in cmds.items():
+        write_bytes(os.path.join(staging, name), dump_compact(cmd))
+    os.rename(staging, queue_dir)
+
+
+def count_files(path):
+    """Count directory entries (0 if the directory does not exist)"""
+    try:
+        with os.scandir(path) as it:
+            return sum(1 for _ in it)
+    except FileNotFoundError:
+        return 0
+
+
+def list_files(path):
+    """List directory entry names (empty if the directory does not exist)"""
+    try:
+        with os.scandir(path) as it:
+            return [e.name for e in it]
+    except FileNotFoundError:
+        return []
+
+
+def wait_for_files(path, n, timeout=15, interval=0.05):
+    """
+    Wait until directory contains at least n entries.
+
+    Wakes on inotify events for the directory; polls every interval when
+    inotify is unavailable or the directory does not exist yet.
+
+    Returns:
+        True if n entries appeared before the timeout
+    """
+    watcher = DirWatcher(poll_interval_s=interval)
+    try:
+        try:
+            watcher.add_watch(path, IN_CREATE | IN_MOVED_TO)
+        except OSError:
+            # Not created yet; a closed watcher just polls
+            watcher.close()
+
+        # Watch before the first count so an entry landing in between
+        # still wakes the wait below
+        deadline = time.monotonic() + timeout
+        while True:
+            if count_files(path) >= n:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            watcher.wait(remaining)
+    finally:
+        watcher.close()
+
+
+def run_runner(session_dir, timeout=20, inflight_mode=None):
+    """
+    Run the runner in-process with --exit-when-idle and wait for it to exit.
+
+    Tests that must signal a live runner (cancel, lease) use spawn_runner()
+    instead. On timeout the runner is asked to stop via ctl/stop.json before
+    TimeoutError is raised.
+    """
+    if inflight_mode is None:
+        target, args = runner_main, (["--session-dir", session_dir, "--exit-when-idle"],)
+    else:
+        # main() has no inflight mode flag; build the Runner directly
+        adapter = DemoToolAdapter.create(workdir=session_dir)
+        runner = Runner(session_dir, adapter, inflight_mode=inflight_mode, exit_when_idle=True)
+        target, args = runner.run, ()
+    t = threading.Thread(
+        target=target,
+        args=args,
+        name=f"runner:{session_dir}",
+        daemon=True,
+    )
+    t.start()
+    t.join(timeout)
+    if t.is_alive():
+        # Stop it so cleanup does not remove the session under a live runner
+        write_json_atomic(os.path.join(session_dir, "ctl", "stop.json"), {"mode": "force"})
+        t.join(RUNNER_STOP_GRACE_S)
+        raise TimeoutError(f"Runner did not exit within {timeout}s")
+
+
+def spawn_runner(session_dir, *args):
+    """Start the runner as a child process for tests that signal it"""
+    return subprocess.Popen(
+        [sys.executable, "-m", "skillpilot.runner.core", "--session-dir", session_dir, *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=RUNNER_ENV,
+    )
+
+
+def kill_fast(proc, grace=RUNNER_TERM_GRACE_S):
+    """
+    Stop a spawned runner, escalating to SIGKILL after a grace period.
+
+    SIGTERM goes first so the runner can terminate its tool process; the
+    default grace covers the runner noticing it (up to IDLE_WAKE_S) so
+    SIGKILL does not orphan the tool's process group.
+    """
+    if proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
 
 
 class TestRunner:
     """Helper to run integration tests"""
 
-    def __init__(self):
-        self.temp_dir = tempfile.mkdtemp(prefix="skillpilot_test_")
+    def __init__(self, temp_dir=None):
+        """
+        Args:
+            temp_dir: Existing directory to create sessions in; cleaned up
+                by its owner. Default: a fresh tempdir removed by cleanup()
+        """
+        self._owns_temp_dir = temp_dir is None
+        self.temp_dir = temp_dir or tempfile.mkdtemp(prefix="skillpilot_test_", dir=TMP_ROOT)
         self.passed = []
         self.failed = []
 
+    def new_session(self, name):
+        """
+        Create a session directory with the runner's subdirectories.
+
+        Returns:
+            SessionLayout for the new session
+        """
+        layout = SessionLayout(os.path.join(self.temp_dir, name))
+        for d in SESSION_SUBDIRS:
+            os.makedirs(os.path.join(layout.root, d))
+        return layout
+
     def cleanup(self):
-        """Clean up temporary directory"""
-        if os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
+        """Clean up temporary directory, unless an in-process runner still uses it"""
+        if not self._owns_temp_dir or not os.path.exists(self.temp_dir):
+            return
+        prefix = f"runner:{self.temp_dir}{os.sep}"
+        if any(t.name.startswith(prefix) and t.is_alive() for t in threading.enumerate()):
+            print(f"Warning: runner still active, leaving {self.temp_dir}", file=sys.stderr)
+            return
+        shutil.rmtree(self.temp_dir)
 
     def assert_(self, condition, test_name):
         """Assert condition and track results"""
@@ -78,72 +330,54 @@ def test_1_e2e(runner: TestRunner):
     print("Test 1: E2E - Run playbook with 4 commands")
     print("=" * 60)
 
-    session_dir = os.path.join(runner.temp_dir, "test_e2e")
-    os.makedirs(session_dir, exist_ok=True)
+    layout = runner.new_session("test_e2e")
+    session_dir = layout.root
 
     # Write 4 commands to queue
-    queue_dir = os.path.join(session_dir, "queue")
-    os.makedirs(queue_dir, exist_ok=True)
+    queue_dir = layout.queue
 
-    import json
+    cmds = {}
     for i in range(1, 5):
-        cmd = {
+        cmds[f"cmd_{i}_cmd_{i}.json"] = {
+            **BASE_CMD,
             "cmd_id": f"cmd_{i}",
             "seq": i,
-            "kind": "tcl",
             "payload": f'puts "Command {i} executed"\n',
             "timeout_s": 30,
-            "cancel_policy": "ctrl_c",
-            "marker": {
-                "prefix": "__SP_DONE__",
-                "token": f"cmd_{i}",
-                "mode": "runner_inject",
-            },
+            "marker": {**BASE_CMD["marker"], "token": f"cmd_{i}"},
         }
-        with open(os.path.join(queue_dir, f"cmd_{i}_cmd_{i}.json"), "w") as f:
-            json.dump(cmd, f, indent=2)
+    write_queue(queue_dir, cmds)
 
-    # Start runner
-    runner_proc = subprocess.Popen(
-        [sys.executable, "-m", "skillpilot.runner.core", "--session-dir", session_dir],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
+    # Run until the queue is drained; the runner exits on its own
+    run_runner(session_dir)
 
-    # Wait for commands to complete
-    time.sleep(5)
+    result_dir = layout.result
 
     # Check results
-    result_dir = os.path.join(session_dir, "result")
-    output_dir = os.path.join(session_dir, "output")
-    log_dir = os.path.join(session_dir, "log")
-
-    # Check result files exist
-    result_files = os.listdir(result_dir) if os.path.exists(result_dir) else []
-    runner.assert_(len(result_files) == 4, "All 4 result files created")
-
-    # Check all results are ok
-    all_ok = True
-    for f in result_files:
-        with open(os.path.join(result_dir, f)) as rf:
-            data = json.load(rf)
-            if data.get("status") != "ok":
-                all_ok = False
-                print(f"    Warning: {f} status is {data.get('status')}")
-    runner.assert_(all_ok, "All commands completed with status=ok")
-
-    # Check output files exist
-    output_files = os.listdir(output_dir) if os.path.exists(output_dir) else []
-    runner.assert_(len(output_files) == 4, "All 4 output files created")
+    output_dir = layout.output
+    log_dir = layout.log
+
+    # Count and check result files in one directory pass
+    total = ok = 0
+    with os.scandir(result_dir) as it:
+        for e in it:
+            total += 1
+            status = _loads(Path(e.path).read_bytes()).get("status")
+            if status == "ok":
+                ok += 1
+            else:
+                print(f"    Warning: {e.name} status is {status}")
+    runner.assert_(total == 4, "All 4 result files created")
+    runner.assert_(ok == 4, "All commands completed with status=ok")
+
+    # Check output files by name in one directory read
+    expected_outputs = {f"cmd_{i}_cmd_{i}.out" for i in range(1, 5)}
+    runner.assert_(set(list_files(output_dir)) == expected_outputs, "All 4 output files created")
 
     # Check session log exists
     session_log = os.path.join(log_dir, "session.out")
     runner.assert_(os.path.exists(session_log), "Session log file created")
 
-    # Stop runner
-    runner_proc.terminate()
-    runner_proc.wait(timeout=5)
-
 
 def test_2_marker_detection(runner: TestRunner):
     """
@@ -152,53 +386,58 @@ def test_2_marker_detection(runner: TestRunner):
     Expected:
     - Marker in output is detected even if split across chunks
     - Command completes with status=ok and exit_reason=marker_seen
+    - The PTY echo of the injected marker line does not end a command early
+    - Marker is detected after output that leaves the cursor mid-line
     """
     print("\n" + "=" * 60)
     print("Test 2: Marker detection across chunks")
     print("=" * 60)
 
-    session_dir = os.path.join(runner.temp_dir, "test_marker")
-    os.makedirs(session_dir, exist_ok=True)
+    layout = runner.new_session("test_marker")
+    session_dir = layout.root
 
-    # Write command with marker that might split across chunks
-    queue_dir = os.path.join(session_dir, "queue")
-    os.makedirs(queue_dir, exist_ok=True)
+    queue_dir = layout.queue
 
-    import json
-    cmd = {
+    cmds = {}
+    # This uses slow_puts which outputs in chunks
+    cmds["cmd_1_marker_test.json"] = {
+        **BASE_CMD,
         "cmd_id": "marker_test",
         "seq": 1,
-        "kind": "tcl",
-        # This uses slow_puts which outputs in chunks
         "payload": 'slow_puts "This is a long output string that will be split across chunks"\n',
         "timeout_s": 30,
-        "cancel_policy": "ctrl_c",
-        "marker": {
-            "prefix": "__SP_DONE__",
-            "token": "marker_test",
-            "mode": "runner_inject",
-        },
+        "marker": {**BASE_CMD["marker"], "token": "marker_test"},
     }
-    with open(os.path.join(queue_dir, "cmd_1_marker_test.json"), "w") as f:
-        json.dump(cmd, f, indent=2)
+    # The echoed marker line arrives right away; output after the sleep
+    # only if the command waits for the real marker
+    cmds["cmd_2_marker_echo.json"] = {
+        **BASE_CMD,
+        "cmd_id": "marker_echo",
+        "seq": 2,
+        "payload": "sleep 1\n",
+        "marker": {**BASE_CMD["marker"], "token": "marker_echo"},
+    }
+    # No trailing newline before the injected marker
+    cmds["cmd_3_marker_midline.json"] = {
+        **BASE_CMD,
+        "cmd_id": "marker_midline",
+        "seq": 3,
+        "payload": 'puts -nonewline "partial line"\n',
+        "timeout_s": 5,
+        "marker": {**BASE_CMD["marker"], "token": "marker_midline"},
+    }
+    write_queue(queue_dir, cmds)
 
-    # Start runner
-    runner_proc = subprocess.Popen(
-        [sys.executable, "-m", "skillpilot.runner.core", "--session-dir", session_dir],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
+    # Run until the queue is drained; the runner exits on its own
+    run_runner(session_dir)
 
-    # Wait for completion
-    time.sleep(5)
+    result_dir = layout.result
 
-    # Check result
-    result_dir = os.path.join(session_dir, "result")
-    result_files = os.listdir(result_dir) if os.path.exists(result_dir) else []
-    runner.assert_(len(result_files) == 1, "Result file created")
+    # Check results
+    result_files = list_files(result_dir)
+    runner.assert_(len(result_files) == 3, "Result files created")
 
-    with open(os.path.join(result_dir, result_files[0])) as f:
-        data = json.load(f)
+    data = _loads(Path(result_dir, "cmd_1_marker_test.json").read_bytes())
 
     runner.assert_(data.get("status") == "ok", "Command completed with status=ok")
     runner.assert_(
@@ -206,9 +445,18 @@ def test_2_marker_detection(runner: TestRunner):
         "Exit reason is marker_seen"
     )
 
-    # Stop runner
-    runner_proc.terminate()
-    runner_proc.wait(timeout=5)
+    data = _loads(Path(result_dir, "cmd_2_marker_echo.json").read_bytes())
+    output = Path(layout.output, "cmd_2_marker_echo.out").read_bytes()
+    runner.assert_(
+        data.get("status") == "ok" and b"done sleeping" in output,
+        "Echoed marker line does not end the command"
+    )
+
+    data = _loads(Path(result_dir, "cmd_3_marker_midline.json").read_bytes())
+    runner.assert_(
+        data.get("exit_reason") == "marker_seen",
+        "Marker detected after output without trailing newline"
+    )
 
 
 def test_3_timeout(runner: TestRunner):
@@ -223,85 +471,62 @@ def test_3_timeout(runner: TestRunner):
     print("Test 3: Timeout handling")
     print("=" * 60)
 
-    session_dir = os.path.join(runner.temp_dir, "test_timeout")
-    os.makedirs(session_dir, exist_ok=True)
+    layout = runner.new_session("test_timeout")
+    session_dir = layout.root
 
     # Write two commands: one with short timeout, one normal
-    queue_dir = os.path.join(session_dir, "queue")
-    os.makedirs(queue_dir, exist_ok=True)
+    queue_dir = layout.queue
 
-    import json
     # First command will timeout (1s timeout on 5s sleep)
     cmd_timeout = {
+        **BASE_CMD,
         "cmd_id": "timeout_test",
         "seq": 1,
-        "kind": "tcl",
         "payload": "sleep 5\n",
         "timeout_s": 1,
-        "cancel_policy": "ctrl_c",
-        "marker": {
-            "prefix": "__SP_DONE__",
-            "token": "timeout_test",
-            "mode": "runner_inject",
-        },
+        "marker": {**BASE_CMD["marker"], "token": "timeout_test"},
     }
-    with open(os.path.join(queue_dir, "cmd_1_timeout_test.json"), "w") as f:
-        json.dump(cmd_timeout, f, indent=2)
 
     # Second command should succeed
     cmd_ok = {
+        **BASE_CMD,
         "cmd_id": "ok_test",
         "seq": 2,
-        "kind": "tcl",
         "payload": "puts 'Hello'\n",
-        "timeout_s": 10,
-        "cancel_policy": "ctrl_c",
-        "marker": {
-            "prefix": "__SP_DONE__",
-            "token": "ok_test",
-            "mode": "runner_inject",
-        },
+        "marker": {**BASE_CMD["marker"], "token": "ok_test"},
     }
-    with open(os.path.join(queue_dir, "cmd_2_ok_test.json"), "w") as f:
-        json.dump(cmd_ok, f, indent=2)
+    write_queue(queue_dir, {
+        "cmd_1_timeout_test.json": cmd_timeout,
+        "cmd_2_ok_test.json": cmd_ok,
+    })
 
-    # Start runner
-    runner_proc = subprocess.Popen(
-        [sys.executable, "-m", "skillpilot.runner.core", "--session-dir", session_dir],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
+    # Run until the queue is drained; the runner exits on its own
+    run_runner(session_dir)
 
-    # Wait for commands to complete
-    time.sleep(12)
+    result_dir = layout.result
 
     # Check results
-    result_dir = os.path.join(session_dir, "result")
-    result_files = sorted(os.listdir(result_dir) if os.path.exists(result_dir) else [])
+    # Order by numeric seq (cmd_<seq>_<id>.json); lexicographic breaks at seq 10
+    result_files = sorted(list_files(result_dir), key=lambda name: int(name.split("_")[1]))
 
     runner.assert_(len(result_files) == 2, "Both result files created")
 
-    # First result should be ok (demo tool completes fast)
-    with open(os.path.join(result_dir, result_files[0])) as f:
-        data1 = json.load(f)
+    # First result should be timeout (1s limit on a 5s sleep)
+    data1 = _loads(Path(result_dir, result_files[0]).read_bytes())
     runner.assert_(
-        data1.get("status") == "ok",
-        "First command completed"
+        data1.get("status") == "timeout",
+        "First command timed out"
     )
 
     # Second result should be ok (runner continued after timeout)
-    with open(os.path.join(result_dir, result_files[1])) as f:
-        data2 = json.load(f)
+    data2 = _loads(Path(result_dir, result_files[1]).read_bytes())
     runner.assert_(
         data2.get("status") == "ok",
         "Second command succeeded (runner continued)"
     )
 
-    # Stop runner
-    runner_proc.terminate()
-    runner_proc.wait(timeout=5)
-
 
+@skip("demo tool limitation")
 def test_4_cancel(runner: TestRunner):
     """
     Test 4: Cancel via ctrl-c (DISABLED)
@@ -310,68 +535,48 @@ def test_4_cancel(runner: TestRunner):
     The demo tool processes commands in a way that doesn't properly
     simulate cancellation, making this test unreliable.
     """
-    print("\n" + "=" * 60)
-    print("Test 4: Cancel via ctrl-c (SKIPPED - demo tool limitation)")
-    print("=" * 60)
-    return
-
-    session_dir = os.path.join(runner.temp_dir, "test_cancel")
-    os.makedirs(session_dir, exist_ok=True)
+    layout = runner.new_session("test_cancel")
+    session_dir = layout.root
 
     # Write long-running command
-    queue_dir = os.path.join(session_dir, "queue")
-    os.makedirs(queue_dir, exist_ok=True)
+    queue_dir = layout.queue
 
-    import json
     cmd = {
+        **BASE_CMD,
         "cmd_id": "cancel_test",
         "seq": 1,
-        "kind": "tcl",
         "payload": "sleep 30\n",
         "timeout_s": 60,
-        "cancel_policy": "ctrl_c",
-        "marker": {
-            "prefix": "__SP_DONE__",
-            "token": "cancel_test",
-            "mode": "runner_inject",
-        },
+        "marker": {**BASE_CMD["marker"], "token": "cancel_test"},
     }
-    with open(os.path.join(queue_dir, "cmd_1_cancel_test.json"), "w") as f:
-        json.dump(cmd, f, indent=2)
+    write_json_atomic(os.path.join(queue_dir, "cmd_1_cancel_test.json"), cmd)
 
     # Start runner
-    runner_proc = subprocess.Popen(
-        [sys.executable, "-m", "skillpilot.runner.core", "--session-dir", session_dir],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
+    runner_proc = spawn_runner(session_dir)
 
     # Wait for command to start
-    time.sleep(2)
+    wait_for_files(layout.inflight, 1)
 
     # Write cancel request
-    ctl_dir = os.path.join(session_dir, "ctl")
-    os.makedirs(ctl_dir, exist_ok=True)
+    ctl_dir = layout.ctl
     cancel_req = {
         "scope": "current",
         "cmd_id": None,
         "ts": str(int(time.time() * 1000)),
     }
-    with open(os.path.join(ctl_dir, "cancel.json"), "w") as f:
-        json.dump(cancel_req, f, indent=2)
+    write_json_atomic(os.path.join(ctl_dir, "cancel.json"), cancel_req)
 
     print("  Cancel request written", file=sys.stderr)
 
     # Wait for cancellation (demo tool needs time to process Ctrl-C)
-    time.sleep(5)
+    result_dir = layout.result
+    wait_for_files(result_dir, 1)
 
     # Check result
-    result_dir = os.path.join(session_dir, "result")
-    result_files = os.listdir(result_dir) if os.path.exists(result_dir) else []
+    result_files = list_files(result_dir)
     runner.assert_(len(result_files) == 1, "Result file created after cancel")
 
-    with open(os.path.join(result_dir, result_files[0])) as f:
-        data = json.load(f)
+    data = _loads(Path(result_dir, result_files[0]).read_bytes())
 
     # Debug: print actual values
     print(f"  Actual status: {data.get('status')}, exit_reason: {data.get('exit_reason')}", file=sys.stderr)
@@ -386,10 +591,10 @@ def test_4_cancel(runner: TestRunner):
     )
 
     # Stop runner
-    runner_proc.terminate()
-    runner_proc.wait(timeout=5)
+    kill_fast(runner_proc)
 
 
+@skip("timing issues")
 def test_5_lease(runner: TestRunner):
     """
     Test 5: Lease expiration (DISABLED)
@@ -398,75 +603,57 @@ def test_5_lease(runner: TestRunner):
     The test is flaky because it depends on exact timing of
     file I/O and runner loop iterations, which varies by system load.
     """
-    print("\n" + "=" * 60)
-    print("Test 5: Lease expiration (SKIPPED - timing issues)")
-    print("=" * 60)
-    return
-
-    session_dir = os.path.join(runner.temp_dir, "test_lease")
-    os.makedirs(session_dir, exist_ok=True)
+    layout = runner.new_session("test_lease")
+    session_dir = layout.root
 
     # Write command
-    queue_dir = os.path.join(session_dir, "queue")
-    os.makedirs(queue_dir, exist_ok=True)
+    queue_dir = layout.queue
 
-    import json
     cmd = {
+        **BASE_CMD,
         "cmd_id": "lease_test",
         "seq": 1,
-        "kind": "tcl",
         "payload": "sleep 10\n",
         "timeout_s": 30,
-        "cancel_policy": "ctrl_c",
-        "marker": {
-            "prefix": "__SP_DONE__",
-            "token": "lease_test",
-            "mode": "runner_inject",
-        },
+        "marker": {**BASE_CMD["marker"], "token": "lease_test"},
     }
-    with open(os.path.join(queue_dir, "cmd_1_lease_test.json"), "w") as f:
-        json.dump(cmd, f, indent=2)
+    write_json_atomic(os.path.join(queue_dir, "cmd_1_lease_test.json"), cmd)
 
     # Write already-expired lease
-    state_dir = os.path.join(session_dir, "state")
-    os.makedirs(state_dir, exist_ok=True)
+    state_dir = layout.state
     lease_req = {
         "lease_id": "test_lease",
         "expires_at": str(int((time.time() - 1000) * 1000)),  # Expired 1000s ago
         "owner": "test",
     }
-    with open(os.path.join(state_dir, "lease.json"), "w") as f:
-        json.dump(lease_req, f, indent=2)
-    
-    # Small delay to ensure file is written and runner has time to read it
-    time.sleep(0.5)
+    # Published before the runner starts, so it sees the lease on its first
+    # control check (no fsync needed for another process to read it)
+    write_json_atomic(os.path.join(state_dir, "lease.json"), lease_req)
 
     # Start runner
-    runner_proc = subprocess.Popen(
-        [sys.executable, "-m", "skillpilot.runner.core", "--session-dir", session_dir],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
+    runner_proc = spawn_runner(session_dir)
+
+    # Wait for lease expiration to stop the runner
+    try:
+        runner_proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        pass
+    runner.assert_(runner_proc.poll() is not None, "Runner exited on expired lease")
 
-    # Wait for lease expiration to trigger
-    time.sleep(5)
+    # The lease is checked before the queue, so the command never ran
+    runner.assert_(count_files(layout.result) == 0, "Queued command not executed")
 
-    # Check that runner is stopping
+    # The runner records its final phase on the way out
     state_file = os.path.join(state_dir, "state.json")
-    if os.path.exists(state_file):
-        with open(state_file) as f:
-            data = json.load(f)
-            phase = data.get("phase")
-            runner.assert_(
-                phase in ["stopping", "error"],
-                f"Runner stopped due to lease (phase: {phase})"
-            )
+    runner.assert_(os.path.exists(state_file), "State file written")
+    phase = _loads(Path(state_file).read_bytes()).get("phase")
+    runner.assert_(phase == "stopping", f"Runner stopped due to lease (phase: {phase})")
 
     # Stop runner
-    runner_proc.terminate()
-    runner_proc.wait(timeout=5)
+    kill_fast(runner_proc)
 
 
+@skip("timing issues")
 def test_6_recovery(runner: TestRunner):
     """
     Test 6: Recovery after restart (DISABLED)
@@ -475,104 +662,69 @@ def test_6_recovery(runner: TestRunner):
     The test is flaky because it depends on exact timing of
     runner execution and file I/O, which varies by system load.
     """
-    print("\n" + "=" * 60)
-    print("Test 6: Recovery after restart (SKIPPED - timing issues)")
-    print("=" * 60)
-    return
-
-    session_dir = os.path.join(runner.temp_dir, "test_recovery")
-    os.makedirs(session_dir, exist_ok=True)
+    layout = runner.new_session("test_recovery")
+    session_dir = layout.root
 
     # Setup: Create queue with 2 commands
-    queue_dir = os.path.join(session_dir, "queue")
-    os.makedirs(queue_dir, exist_ok=True)
+    queue_dir = layout.queue
 
-    import json
     # First command
     cmd1 = {
+        **BASE_CMD,
         "cmd_id": "recovery_cmd1",
         "seq": 1,
-        "kind": "tcl",
         "payload": "puts 'Command 1'\n",
-        "timeout_s": 10,
-        "cancel_policy": "ctrl_c",
-        "marker": {
-            "prefix": "__SP_DONE__",
-            "token": "recovery_cmd1",
-            "mode": "runner_inject",
-        },
+        "marker": {**BASE_CMD["marker"], "token": "recovery_cmd1"},
     }
-    with open(os.path.join(queue_dir, "cmd_1_recovery_cmd1.json"), "w") as f:
-        json.dump(cmd1, f, indent=2)
 
     # Second command
     cmd2 = {
+        **BASE_CMD,
         "cmd_id": "recovery_cmd2",
         "seq": 2,
-        "kind": "tcl",
         "payload": "puts 'Command 2'\n",
-        "timeout_s": 10,
-        "cancel_policy": "ctrl_c",
-        "marker": {
-            "prefix": "__SP_DONE__",
-            "token": "recovery_cmd2",
-            "mode": "runner_inject",
-        },
+        "marker": {**BASE_CMD["marker"], "token": "recovery_cmd2"},
     }
-    with open(os.path.join(queue_dir, "cmd_2_recovery_cmd2.json"), "w") as f:
-        json.dump(cmd2, f, indent=2)
+    write_queue(queue_dir, {
+        "cmd_1_recovery_cmd1.json": cmd1,
+        "cmd_2_recovery_cmd2.json": cmd2,
+    })
 
     # Pre-create result for first command (simulating previous execution)
-    result_dir = os.path.join(session_dir, "result")
-    os.makedirs(result_dir, exist_ok=True)
+    result_dir = layout.result
     result1 = {
         "cmd_id": "recovery_cmd1",
         "status": "ok",
         "start_ts": str(int(time.time() * 1000)),
         "end_ts": str(int(time.time() * 1000)),
         "exit_reason": "marker_seen",
-        "output_path": os.path.join(session_dir, "output", "cmd_1_recovery_cmd1.out"),
+        "output_path": os.path.join(layout.output, "cmd_1_recovery_cmd1.out"),
     }
-    with open(os.path.join(result_dir, "cmd_1_recovery_cmd1.json"), "w") as f:
-        json.dump(result1, f, indent=2)
-
-    # Start runner
-    runner_proc = subprocess.Popen(
-        [sys.executable, "-m", "skillpilot.runner.core", "--session-dir", session_dir],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
+    write_bytes(os.path.join(result_dir, "cmd_1_recovery_cmd1.json"), dump_compact(result1))
 
-    # Wait for execution
-    time.sleep(3)
+    # Run until the queue is drained; the runner exits on its own
+    run_runner(session_dir)
 
     # Check results: only second command should have been executed
-    result_files = os.listdir(result_dir) if os.path.exists(result_dir) else []
     runner.assert_(
-        len(result_files) == 2,
+        count_files(result_dir) == 2,
         "Both result files exist (one pre-existing, one new)"
     )
 
     # Check output: only second command should have output
-    output_dir = os.path.join(session_dir, "output")
-    output_files = os.listdir(output_dir) if os.path.exists(output_dir) else []
+    output_dir = layout.output
     runner.assert_(
-        len(output_files) == 2,
+        count_files(output_dir) == 2,
         "Both output files exist"
     )
 
     # Verify first output was NOT updated (timestamp check)
-    with open(os.path.join(result_dir, "cmd_1_recovery_cmd1.json")) as f:
-        data1 = json.load(f)
+    data1 = _loads(Path(result_dir, "cmd_1_recovery_cmd1.json").read_bytes())
     runner.assert_(
         data1.get("exit_reason") == "marker_seen",
         "First command was skipped (result from before)"
     )
 
-    # Stop runner
-    runner_proc.terminate()
-    runner_proc.wait(timeout=5)
-
 
 def test_7_audit(runner: TestRunner):
     """
@@ -587,74 +739,152 @@ def test_7_audit(runner: TestRunner):
     print("Test 7: Audit logging")
     print("=" * 60)
 
-    session_dir = os.path.join(runner.temp_dir, "test_audit")
-    os.makedirs(session_dir, exist_ok=True)
+    layout = runner.new_session("test_audit")
+    session_dir = layout.root
 
     # Write 3 commands
-    queue_dir = os.path.join(session_dir, "queue")
-    os.makedirs(queue_dir, exist_ok=True)
+    queue_dir = layout.queue
 
-    import json
+    cmds = {}
     for i in range(1, 4):
-        cmd = {
+        cmds[f"cmd_{i}_audit_cmd{i}.json"] = {
+            **BASE_CMD,
             "cmd_id": f"audit_cmd{i}",
             "seq": i,
-            "kind": "tcl",
             "payload": f'puts "Audit test {i}"\n',
-            "timeout_s": 10,
-            "cancel_policy": "ctrl_c",
-            "marker": {
-                "prefix": "__SP_DONE__",
-                "token": f"audit_cmd{i}",
-                "mode": "runner_inject",
-            },
+            "marker": {**BASE_CMD["marker"], "token": f"audit_cmd{i}"},
         }
-        with open(os.path.join(queue_dir, f"cmd_{i}_audit_cmd{i}.json"), "w") as f:
-            json.dump(cmd, f, indent=2)
-
-    # Start runner
-    runner_proc = subprocess.Popen(
-        [sys.executable, "-m", "skillpilot.runner.core", "--session-dir", session_dir],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-    )
+    write_queue(queue_dir, cmds)
 
-    # Wait for completion
-    time.sleep(5)
+    # Run until the queue is drained; the runner exits on its own
+    run_runner(session_dir)
 
     # Check session log
-    log_file = os.path.join(session_dir, "log", "session.out")
+    log_file = os.path.join(layout.log, "session.out")
     runner.assert_(os.path.exists(log_file), "Session log file exists")
 
+    # First position of each "Audit test N" line, in one pass over the
+    # mapped log (mmap rejects empty files, which simply have no matches)
+    positions = {}
     with open(log_file, "rb") as f:
-        log_content = f.read()
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for m in AUDIT_RE.finditer(mm):
+                    positions.setdefault(int(m.group(1)), m.start())
 
-    runner.assert_(
-        b"Audit test 1" in log_content,
-        "Command 1 output in log"
-    )
-    runner.assert_(
-        b"Audit test 2" in log_content,
-        "Command 2 output in log"
-    )
-    runner.assert_(
-        b"Audit test 3" in log_content,
-        "Command 3 output in log"
-    )
+    for i in range(1, 4):
+        runner.assert_(i in positions, f"Command {i} output in log")
 
     # Check chronological order (1 appears before 2, 2 before 3)
-    pos1 = log_content.find(b"Audit test 1")
-    pos2 = log_content.find(b"Audit test 2")
-    pos3 = log_content.find(b"Audit test 3")
-
     runner.assert_(
-        pos1 < pos2 < pos3,
+        positions[1] < positions[2] < positions[3],
         "Outputs in chronological order"
     )
 
-    # Stop runner
-    runner_proc.terminate()
-    runner_proc.wait(timeout=5)
+
+def test_8_inflight_recovery(runner: TestRunner):
+    """
+    Test 8: Recovery of commands left in flight by a dead runner
+
+    Expected (both inflight modes):
+    - A stale inflight/ entry gets an error result with exit_reason=runner_died
+    - It no longer blocks the queue: the next command runs normally
+    - inflight/ and queue/ are empty afterwards
+    """
+    print("\n" + "=" * 60)
+    print("Test 8: Inflight recovery after runner death")
+    print("=" * 60)
+
+    def cmd(cmd_id, seq):
+        return {
+            **BASE_CMD,
+            "cmd_id": cmd_id,
+            "seq": seq,
+            "payload": f"puts '{cmd_id}'\n",
+            "marker": {**BASE_CMD["marker"], "token": cmd_id},
+        }
+
+    for mode in ("rename", "marker"):
+        layout = runner.new_session(f"test_inflight_{mode}")
+        os.makedirs(layout.inflight)
+
+        # What a runner killed mid-command leaves behind: rename mode moved
+        # the queue file to inflight/; marker mode left it queued behind an
+        # empty marker
+        stale = cmd("stale", 1)
+        if mode == "rename":
+            write_bytes(os.path.join(layout.inflight, "cmd_1_stale.json"), dump_compact(stale))
+            write_queue(layout.queue, {"cmd_2_next.json": cmd("next", 2)})
+        else:
+            write_bytes(os.path.join(layout.inflight, "cmd_1_stale.json"), b"")
+            write_queue(layout.queue, {
+                "cmd_1_stale.json": stale,
+                "cmd_2_next.json": cmd("next", 2),
+            })
+        # The dead runner's last state; its pid is above PID_MAX_LIMIT, so
+        # it can never be alive
+        write_json_atomic(os.path.join(layout.state, "state.json"), {
+            "phase": "busy",
+            "runner_pid": 2 ** 22 + 1,
+            "current_cmd_id": "stale",
+        })
+
+        run_runner(layout.root, inflight_mode=mode)
+
+        stale_result = _loads(Path(layout.result, "cmd_1_stale.json").read_bytes())
+        runner.assert_(
+            stale_result.get("status") == "error"
+            and stale_result.get("exit_reason") == "runner_died",
+            f"[{mode}] Stale inflight command reported as runner_died"
+        )
+        next_result = _loads(Path(layout.result, "cmd_2_next.json").read_bytes())
+        runner.assert_(next_result.get("status") == "ok", f"[{mode}] Next command still runs")
+        runner.assert_(
+            not list_files(layout.inflight) and not list_files(layout.queue),
+            f"[{mode}] inflight/ and queue/ drained"
+        )
+
+
+TESTS = [
+    test_1_e2e,
+    test_2_marker_detection,
+    test_3_timeout,
+    test_4_cancel,
+    test_5_lease,
+    test_6_recovery,
+    test_7_audit,
+    test_8_inflight_recovery,
+]
+
+
+def run_isolated(test_fn, temp_dir=None):
+    """
+    Run one test with its own TestRunner.
+
+    Args:
+        test_fn: Test to run
+        temp_dir: Shared root for the session directory (session names are
+            unique per test); default is a private tempdir
+
+    Returns:
+        Tuple of (passed, failed, captured stdout)
+    """
+    test_runner = TestRunner(temp_dir)
+    out = io.StringIO()
+    try:
+        # Runner chatter goes to stderr; drop it like a captured subprocess
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            try:
+                test_fn(test_runner)
+            except AssertionError:
+                pass  # Already recorded in test_runner.failed
+            except Exception as e:
+                # e.g. a hung runner: fail this test, not the whole suite
+                test_runner.failed.append(f"{test_fn.__name__}: {type(e).__name__}: {e}")
+                print(f"  FAIL: {test_fn.__name__} raised {type(e).__name__}: {e}")
+    finally:
+        test_runner.cleanup()
+    return test_runner.passed, test_runner.failed, out.getvalue()
 
 
 def main():
@@ -663,26 +893,33 @@ def main():
     print("Testing all 7 acceptance criteria")
     print()
 
-    test_runner = TestRunner()
-
+    # Tests share nothing (own session dir and runner process each), so
+    # run them concurrently and report in order. One tempdir serves the
+    # whole run and is removed once at the end
+    summary = TestRunner()
     try:
-        # Run all tests
-        test_1_e2e(test_runner)
-        test_2_marker_detection(test_runner)
-        test_3_timeout(test_runner)
-        test_4_cancel(test_runner)
-        test_5_lease(test_runner)
-        test_6_recovery(test_runner)
-        test_7_audit(test_runner)
+        enabled = [t for t in TESTS if not getattr(t, "_skipped", None)]
+        # At least one worker (ProcessPoolExecutor rejects 0), at most one per core
+        workers = max(1, min(len(enabled), os.cpu_count() or 1))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {t: pool.submit(run_isolated, t, summary.temp_dir) for t in enabled}
+            for test_fn in TESTS:
+                if test_fn not in futures:
+                    print(f"\nSKIP: {test_fn.__name__} ({test_fn._skipped})")
+                    continue
+                passed, failed, output = futures[test_fn].result()
+                print(output, end="")
+                summary.passed.extend(passed)
+                summary.failed.extend(failed)
 
         # Report results
-        success = test_runner.report()
+        success = summary.report()
 
         return 0 if success else 1
 
     finally:
         # Cleanup
-        test_runner.cleanup()
+        summary.cleanup()
 
 
 if __name__ == "__main__":
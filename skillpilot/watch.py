@@ -0,0 +1,141 @@
+"""
+Directory change notification for the file control plane.
+
+On Linux this wraps inotify (via ctypes, no extra dependency) so the Runner
+can sleep until its queue or control directories change, and the Master
+until a result lands. Elsewhere it falls back to a short fixed poll interval.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+
+# struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+_EVENT = struct.Struct("iIII")
+
+
+class DirWatcher:
+    """
+    Wait for files to land in a set of directories.
+
+    Usage:
+        watcher = DirWatcher()
+        watcher.add_watch(queue_dir, IN_CLOSE_WRITE | IN_MOVED_TO)
+        changed = watcher.wait(1.0)  # set of directories with events
+    """
+
+    def __init__(self, poll_interval_s: float = 0.1):
+        """
+        Initialize watcher.
+
+        Args:
+            poll_interval_s: Sleep per wait() when inotify is unavailable
+        """
+        self.poll_interval_s = poll_interval_s
+        self._fd: Optional[int] = None
+        self._libc = None
+        # Watch descriptor -> directory
+        self._wd_dirs: Dict[int, str] = {}
+        # Watch descriptor -> file names that count (absent: any name)
+        self._wd_names: Dict[int, FrozenSet[bytes]] = {}
+        self._dirs: Set[str] = set()
+
+        if sys.platform.startswith("linux"):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            except (OSError, AttributeError):
+                fd = -1
+            if fd >= 0:
+                self._fd = fd
+                self._libc = libc
+
+    @property
+    def enabled(self) -> bool:
+        """True when backed by inotify rather than polling"""
+        return self._fd is not None
+
+    def fileno(self) -> Optional[int]:
+        """Return the inotify fd, or None when polling"""
+        return self._fd
+
+    def add_watch(self, path: str, mask: int, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Watch a directory for the given inotify events.
+
+        Args:
+            path: Directory to watch
+            mask: IN_* event mask
+            names: Only events for these file names count (default: any).
+                Ignored when polling
+        """
+        self._dirs.add(path)
+        if self._fd is None:
+            return
+
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        self._wd_dirs[wd] = path
+        if names is not None:
+            self._wd_names[wd] = frozenset(os.fsencode(n) for n in names)
+
+    def wait(self, timeout: float) -> Set[str]:
+        """
+        Block until a watched directory changes or the timeout elapses.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Directories that saw events. When polling, every watched
+            directory is reported since changes cannot be detected.
+        """
+        if self._fd is None:
+            time.sleep(max(0.0, min(timeout, self.poll_interval_s)))
+            return set(self._dirs)
+
+        # Events for filtered-out names are drained without waking the caller
+        deadline = time.monotonic() + max(0.0, timeout)
+        changed: Set[str] = set()
+        while not changed:
+            ready, _, _ = select.select([self._fd], [], [], max(0.0, deadline - time.monotonic()))
+            if not ready:
+                break
+            while True:
+                try:
+                    data = os.read(self._fd, 4096)
+                except BlockingIOError:
+                    break
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _cookie, name_len = _EVENT.unpack_from(data, offset)
+                    name_start = offset + _EVENT.size
+                    offset = name_start + name_len
+                    if mask & IN_Q_OVERFLOW:
+                        changed.update(self._dirs)
+                    elif wd in self._wd_dirs:
+                        names = self._wd_names.get(wd)
+                        if names is None or data[name_start:offset].rstrip(b"\0") in names:
+                            changed.add(self._wd_dirs[wd])
+        return changed
+
+    def close(self) -> None:
+        """Release the inotify descriptor"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._wd_dirs.clear()
+            self._wd_names.clear()